@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+EPIC/EPTS 초록 HTTP API 서비스 (CMS 연동용)
+- Streamlit 화면 없이 PDF를 올리면 워커 풀이 process_one_pdf / process_one_pdf_epts로 처리
+  (cascade=1이면 process_one_pdf_cascade: 저가 모델 먼저, 구조 검증 실패 시 상위 모델)
+- 대기열이 가득 차면 429 (Retry-After) 반환
+- 같은 내용(SHA-256)·같은 모드의 PDF는 같은 작업으로 취급 (중복 제출 시 기존 작업 반환)
+- 표준 라이브러리(http.server)만 사용
+
+엔드포인트:
+    POST /v1/abstracts?mode=epic|epts[&filename=...][&model=...][&cascade=1]   본문: PDF 바이트
+         → 202 {"job_id", "status"} (이미 완료된 작업이면 200)
+    GET  /v1/abstracts/{job_id}[?wait=초]   작업 상태 (wait를 주면 완료까지 최대 60초 대기)
+    GET  /v1/abstracts/{job_id}/abstract   완료된 초록 (text/plain)
+    GET  /healthz
+
+실행:
+    set OPENAI_API_KEY=...
+    python api_server.py --host 127.0.0.1 --port 8600 --workers 4 --queue-size 32
+"""
+import argparse
+import hashlib
+import json
+import queue
+import re
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from summary_core import (
+    DEFAULT_PROMPT,
+    get_client,
+    process_one_pdf,
+    process_one_pdf_cascade,
+    process_one_pdf_epts,
+)
+
+MODES = ("epic", "epts")
+MAX_PDF_BYTES = 50 * 1024 * 1024
+MAX_WAIT_SECONDS = 60
+DEFAULT_MODEL = "gpt-4.1"
+
+
+class QueueFullError(Exception):
+    """대기열이 가득 차 작업을 받을 수 없음 (HTTP 429)."""
+
+
+class AbstractService:
+    """
+    크기 제한이 있는 대기열 + 고정 워커 풀.
+    작업 상태: queued → running → done | error
+    """
+
+    def __init__(self, client, workers: int = 4, queue_size: int = 32, max_jobs: int = 1000):
+        self.client = client
+        self.max_jobs = max_jobs
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._jobs: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"abstract-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._workers:
+            t.start()
+
+    @staticmethod
+    def job_id_for(pdf_bytes: bytes, mode: str) -> str:
+        return f"{mode}-{hashlib.sha256(pdf_bytes).hexdigest()[:32]}"
+
+    def submit(
+        self, pdf_bytes: bytes, pdf_name: str, mode: str, model: str = DEFAULT_MODEL, cascade: bool = False
+    ) -> tuple[dict, bool]:
+        """작업 등록. (작업, 새로 만들었는지) 반환. 대기열이 가득 차면 QueueFullError."""
+        job_id = self.job_id_for(pdf_bytes, mode)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            # 실패한 작업은 다시 제출하면 재시도, 그 외에는 기존 작업 반환
+            if job is not None and job["status"] != "error":
+                return job, False
+            job = {
+                "job_id": job_id,
+                "mode": mode,
+                "model": model,
+                "cascade": cascade,
+                "파일명": pdf_name,
+                "status": "queued",
+                "submitted_at": time.time(),
+                "finished_at": None,
+                "result": None,
+                "pdf_bytes": pdf_bytes,
+                "done": threading.Event(),
+            }
+            try:
+                self._queue.put_nowait(job_id)
+            except queue.Full:
+                raise QueueFullError(f"대기열이 가득 찼습니다 ({self._queue.maxsize}건)")
+            self._jobs[job_id] = job
+            self._evict_finished()
+        return job, True
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: float) -> dict | None:
+        job = self.get(job_id)
+        if job is not None and timeout > 0:
+            job["done"].wait(timeout)
+        return job
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _evict_finished(self) -> None:
+        # 보관 개수를 넘으면 오래된 완료 작업부터 정리 (lock 안에서 호출)
+        if len(self._jobs) <= self.max_jobs:
+            return
+        finished = sorted(
+            (j for j in self._jobs.values() if j["status"] in ("done", "error")),
+            key=lambda j: j["finished_at"],
+        )
+        for j in finished[: len(self._jobs) - self.max_jobs]:
+            del self._jobs[j["job_id"]]
+
+    def _work(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            job = self.get(job_id)
+            if job is None:
+                continue
+            job["status"] = "running"
+            pdf_bytes = job.pop("pdf_bytes")
+            try:
+                if job["cascade"]:
+                    result = process_one_pdf_cascade(
+                        self.client, job["파일명"], pdf_bytes, is_epts=job["mode"] == "epts", prompt=DEFAULT_PROMPT
+                    )
+                elif job["mode"] == "epts":
+                    result = process_one_pdf_epts(self.client, job["파일명"], pdf_bytes, model=job["model"])
+                else:
+                    result = process_one_pdf(
+                        self.client, job["파일명"], pdf_bytes, prompt=DEFAULT_PROMPT, model=job["model"]
+                    )
+            except Exception as e:
+                result = {"파일명": job["파일명"], "요약 결과": "", "관리자 경로": "", "오류": str(e)}
+            job["result"] = result
+            job["status"] = "error" if result.get("오류") else "done"
+            job["finished_at"] = time.time()
+            job["done"].set()
+
+
+def job_to_json(job: dict) -> dict:
+    """작업 상태 응답 본문."""
+    body = {
+        "job_id": job["job_id"],
+        "mode": job["mode"],
+        "model": job["model"],
+        "cascade": job["cascade"],
+        "filename": job["파일명"],
+        "status": job["status"],
+        "submitted_at": job["submitted_at"],
+        "finished_at": job["finished_at"],
+    }
+    result = job["result"]
+    if result is not None:
+        body["abstract"] = result.get("요약 결과", "")
+        body["admin_url"] = result.get("관리자 경로", "")
+        body["error"] = result.get("오류")
+        if job["cascade"]:
+            body["used_model"] = result.get("사용 모델", "")
+    return body
+
+
+class AbstractRequestHandler(BaseHTTPRequestHandler):
+    service: AbstractService  # make_server에서 지정
+
+    def _send_json(self, status: int, body: dict, headers: dict | None = None) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_text(self, status: int, text: str) -> None:
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/v1/abstracts":
+            return self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+        params = parse_qs(url.query)
+        mode = params.get("mode", ["epic"])[0].lower()
+        if mode not in MODES:
+            return self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"mode는 {', '.join(MODES)} 중 하나"})
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            return self._send_json(HTTPStatus.BAD_REQUEST, {"error": "PDF 본문이 비어 있습니다"})
+        if length > MAX_PDF_BYTES:
+            return self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "PDF가 너무 큽니다"})
+        pdf_bytes = self.rfile.read(length)
+        if not pdf_bytes.startswith(b"%PDF"):
+            return self._send_json(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, {"error": "PDF 파일이 아닙니다"})
+
+        job_id = self.service.job_id_for(pdf_bytes, mode)
+        filename = params.get("filename", [None])[0] or unquote(self.headers.get("X-Filename", "")) or f"{job_id}.pdf"
+        filename = re.sub(r'[\\/:*?"<>|]', "_", filename)
+        model = params.get("model", [DEFAULT_MODEL])[0]
+        cascade = params.get("cascade", ["0"])[0].lower() in ("1", "true", "yes")
+        try:
+            job, created = self.service.submit(pdf_bytes, filename, mode, model=model, cascade=cascade)
+        except QueueFullError as e:
+            return self._send_json(HTTPStatus.TOO_MANY_REQUESTS, {"error": str(e)}, headers={"Retry-After": "10"})
+        status = HTTPStatus.ACCEPTED if job["status"] in ("queued", "running") else HTTPStatus.OK
+        self._send_json(
+            status,
+            {**job_to_json(job), "created": created},
+            headers={"Location": f"/v1/abstracts/{job['job_id']}"},
+        )
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path.rstrip("/")
+        if path == "/healthz":
+            body = {"status": "ok", "queue_depth": self.service.queue_depth()}
+            if hasattr(self.service.client, "stats"):
+                body["endpoints"] = self.service.client.stats()  # EndpointPool이면 엔드포인트별 상태
+            return self._send_json(HTTPStatus.OK, body)
+
+        m = re.fullmatch(r"/v1/abstracts/([\w-]+)(/abstract)?", path)
+        if not m:
+            return self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+        job_id, want_abstract = m.group(1), bool(m.group(2))
+
+        if want_abstract:
+            job = self.service.get(job_id)
+            if job is None:
+                return self._send_json(HTTPStatus.NOT_FOUND, {"error": "작업을 찾을 수 없습니다"})
+            if job["status"] == "error":
+                return self._send_json(HTTPStatus.UNPROCESSABLE_ENTITY, job_to_json(job))
+            if job["status"] != "done":
+                return self._send_json(HTTPStatus.CONFLICT, job_to_json(job))
+            return self._send_text(HTTPStatus.OK, job["result"].get("요약 결과", ""))
+
+        try:
+            wait = float(parse_qs(url.query).get("wait", ["0"])[0])
+        except ValueError:
+            wait = 0.0
+        job = self.service.wait(job_id, min(max(wait, 0.0), MAX_WAIT_SECONDS))
+        if job is None:
+            return self._send_json(HTTPStatus.NOT_FOUND, {"error": "작업을 찾을 수 없습니다"})
+        self._send_json(HTTPStatus.OK, job_to_json(job))
+
+
+def make_server(service: AbstractService, host: str = "127.0.0.1", port: int = 8600) -> ThreadingHTTPServer:
+    handler = type("BoundAbstractRequestHandler", (AbstractRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="EPIC/EPTS 초록 HTTP API 서비스")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=4, help="동시 처리 워커 수")
+    parser.add_argument("--queue-size", type=int, default=32, help="대기열 최대 길이 (초과 시 429)")
+    args = parser.parse_args()
+
+    service = AbstractService(get_client(), workers=args.workers, queue_size=args.queue_size)
+    server = make_server(service, args.host, args.port)
+    print(f"초록 API 서비스 시작: http://{args.host}:{args.port} (워커 {args.workers}, 대기열 {args.queue_size})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
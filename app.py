@@ -7,6 +7,9 @@ EPIC 초록 작성 앱 (Streamlit)
 import re
 import zipfile
 import io
+import time
+from contextlib import closing
+from datetime import datetime
 from pathlib import Path
 
 import streamlit as st
@@ -17,7 +20,40 @@ from summary_core import (
     process_one_pdf,
     process_pdfs_from_folder,
     process_one_pdf_epts,
+    summarize_cascade_batch,
+    CASCADE_MODELS,
+    SpeculativeUploader,
+    iter_pipeline_modes,
+    iter_packed,
+    admin_url_from_filename,
+    DEFAULT_LATENCY_TRACKER,
+    validate_epic_abstract,
+    validate_epts_abstract,
+    upload_key,
+    generation_settings_key,
+    estimate_pdf_cost,
+    preflight_batch,
+    PIPELINE_WORKERS,
 )
+from doc_index import content_hash, open_index, index_result, lookup, search
+from endpoint_pool import EndpointPool
+from mem_profile import (
+    profile_stage,
+    profiling_requested,
+    resume_profiling,
+    start_profiling,
+    stop_profiling,
+)
+
+MEMORY_REPORT_DIR = Path(__file__).resolve().parent / "memory_reports"
+
+# 작업 유형 → 생성할 초록 모드 (동시 작성은 추출·업로드를 한 번만 하고 두 초록을 함께 생성)
+MODE_LABELS = {"epic": "EPIC 정부 보도자료 초록", "epts": "ETPS 대책자료 초록"}
+TASK_MODES = {
+    MODE_LABELS["epic"]: ("epic",),
+    MODE_LABELS["epts"]: ("epts",),
+    "EPIC + ETPS 동시 작성": ("epic", "epts"),
+}
 
 
 def sanitize_filename(text: str, max_len: int = 80) -> str:
@@ -82,22 +118,12 @@ st.caption("PDF를 업로드하거나 폴더를 선택하면 정해진 규칙에
 # 작업 유형 선택 (꼭지 선택)
 task_mode = st.radio(
     "작업 유형",
-    ["EPIC 정부 보도자료 초록", "ETPS 대책자료 초록"],
+    list(TASK_MODES),
     horizontal=True,
     key="task_mode_radio",
 )
-
-# 작업 유형이나 입력이 변경되면 이전 결과 초기화
-current_task_key = f"task_mode_{task_mode}"
-if "last_task_mode" not in st.session_state or st.session_state["last_task_mode"] != task_mode:
-    # 작업 유형이 변경되면 이전 결과 및 편집 내용 모두 초기화
-    if "summary_results" in st.session_state:
-        del st.session_state["summary_results"]
-    # 해당 작업 유형의 편집 내용도 초기화
-    for key in list(st.session_state.keys()):
-        if key.startswith("summary_edit_"):
-            del st.session_state[key]
-    st.session_state["last_task_mode"] = task_mode
+run_modes = TASK_MODES[task_mode]
+# 결과·편집 내용은 작업 유형별로 따로 보관하므로 작업 유형을 바꿔도 지우지 않음
 
 # API 키 경로 (앱 기준 상대 경로)
 app_dir = Path(__file__).resolve().parent
@@ -111,7 +137,61 @@ with st.sidebar:
     )
     if api_key_custom:
         api_key_path = Path(api_key_custom)
-    model = st.selectbox("모델", ["gpt-4.1", "gpt-4o", "gpt-4o-mini"], index=0)
+    cascade_mode = st.checkbox(
+        "캐스케이드 모드",
+        value=False,
+        help=f"{' → '.join(CASCADE_MODELS)} 순서로 시도하고, 구조 검증에 실패한 문서만 상위 모델로 재시도합니다.",
+    )
+    model = st.selectbox("모델", ["gpt-4.1", "gpt-4o", "gpt-4o-mini"], index=0, disabled=cascade_mode)
+    hedge_mode = st.checkbox(
+        "느린 요청 헤지",
+        value=True,
+        help="모델·문서 크기별 최근 p95 생성 시간을 넘기면 같은 요청을 한 번 더 보내 먼저 끝난 결과를 씁니다. timeout도 p95 기준으로 조정합니다.",
+    )
+    latency_tracker = DEFAULT_LATENCY_TRACKER if hedge_mode else None
+    pack_mode = st.checkbox(
+        "짧은 보도자료 묶음 처리 (EPIC)",
+        value=False,
+        disabled=cascade_mode,
+        help="추출 텍스트가 짧은 문서 여러 건을 한 번의 요청으로 묶어 처리합니다. 분리·검증에 실패한 문서는 단독으로 다시 요청합니다.",
+    )
+    memory_profile = st.checkbox(
+        "메모리 프로파일링",
+        value=profiling_requested(),
+        help="단계별(업로드 읽기·추출·업로드·생성·ZIP) tracemalloc/RSS를 기록해 memory_reports 폴더에 리포트를 남깁니다. 처리 속도가 느려집니다.",
+    )
+    reuse_index = st.checkbox(
+        "이전에 처리한 문서는 재사용",
+        value=True,
+        help="같은 PDF·같은 작업 유형을 같은 모델(캐스케이드 구성)·지시문으로 만든 초록이 검색 인덱스에 있으면 API를 호출하지 않고 그대로 사용합니다. 끄면 이번 실행은 모두 새로 생성합니다.",
+    )
+
+# 처리 이력 검색 (이미 초록을 만든 문서인지 업로드 전에 확인)
+with st.expander("🔍 처리 이력 검색 (부처·키워드·심볼 번호)"):
+    search_query = st.text_input("검색어", key="index_search_query", placeholder="예: 기획재정부, 탄소중립, 12345")
+    search_mode = st.radio("범위", ["전체", "EPIC", "ETPS"], horizontal=True, key="index_search_mode")
+    if search_query:
+        with closing(open_index()) as conn:
+            hits = search(conn, search_query, mode={"EPIC": "epic", "ETPS": "epts"}.get(search_mode))
+        if not hits:
+            st.caption("검색 결과가 없습니다.")
+        for hit in hits:
+            registered = datetime.fromtimestamp(hit["등록일시"]).strftime("%Y-%m-%d %H:%M")
+            with st.expander(f"{hit['파일명']} · {hit['모드'].upper()} · 심볼 {hit['심볼'] or '-'} · {registered}"):
+                st.text(hit["요약 결과"])
+                if hit["관리자 경로"]:
+                    st.link_button("🔎 관리자 경로 열기", hit["관리자 경로"])
+
+# 메모리 프로파일링: 켜져 있는 동안 rerun마다 같은 배치 프로파일러에 이어서 기록
+# 프로파일러는 세션마다 따로 두고, 끌 때도 이 세션이 시작한 프로파일러만 멈춤 (다른 세션의 기록은 유지)
+if memory_profile:
+    mem_profiler = st.session_state.get("mem_profiler")
+    if mem_profiler is None:
+        st.session_state["mem_profiler"] = start_profiling()
+    else:
+        resume_profiling(mem_profiler)
+elif st.session_state.get("mem_profiler") is not None:
+    stop_profiling(st.session_state.pop("mem_profiler"))
 
 st.subheader("📎 PDF 파일 업로드 (여러 개 가능)")
 
@@ -128,10 +208,10 @@ current_file_names = sorted([f.name for f in uploaded]) if uploaded else []
 if "last_uploaded_files" not in st.session_state:
     st.session_state["last_uploaded_files"] = current_file_names
 
-# 업로드 목록이 이전과 다르면 결과 초기화
+# 업로드 목록이 이전과 다르면 결과 초기화 (모든 작업 유형)
 if st.session_state["last_uploaded_files"] != current_file_names:
-    if "summary_results" in st.session_state:
-        del st.session_state["summary_results"]
+    for key in ("summary_results_by_mode", "regen_results", "zip_payloads"):
+        st.session_state.pop(key, None)
     for key in list(st.session_state.keys()):
         if key.startswith("summary_edit_"):
             del st.session_state[key]
@@ -141,8 +221,34 @@ if st.session_state["last_uploaded_files"] != current_file_names:
 pdf_items = []  # (파일명, bytes) 리스트
 
 if uploaded:
-    for f in uploaded:
-        pdf_items.append((f.name, f.read()))
+    with profile_stage("업로드 파일 읽기"):
+        for f in uploaded:
+            pdf_items.append((f.name, f.read()))
+
+# 내용 해시는 업로드 파일마다 한 번만 계산 (rerun마다 모든 PDF를 다시 해시하지 않도록 file_id로 캐시)
+# 미리 업로드·사전 추정·인덱스 조회가 같은 해시를 씀
+content_digests = st.session_state.setdefault("content_digests", {})
+file_ids = [f.file_id for f in uploaded] if uploaded else []
+for file_id, (name, content) in zip(file_ids, pdf_items):
+    if file_id not in content_digests:
+        content_digests[file_id] = content_hash(content)
+for file_id in [k for k in content_digests if k not in file_ids]:
+    del content_digests[file_id]
+pdf_digests = [content_digests[file_id] for file_id in file_ids]
+upload_keys = [upload_key(name, content, digest=d) for (name, content), d in zip(pdf_items, pdf_digests)]
+
+# 실행 버튼을 누르기 전에 미리 업로드 (목록에서 빠진 파일의 미사용 업로드는 정리)
+speculative_uploader = st.session_state.get("speculative_uploader")
+if speculative_uploader is None and pdf_items:
+    try:
+        speculative_uploader = SpeculativeUploader(get_client())
+        st.session_state["speculative_uploader"] = speculative_uploader
+    except Exception:
+        speculative_uploader = None  # API 키가 없으면 실행 시점에 업로드
+if speculative_uploader is not None:
+    for (name, content), key in zip(pdf_items, upload_keys):
+        speculative_uploader.prefetch(name, content, key=key)
+    speculative_uploader.discard_except(upload_keys)
 
 if not pdf_items:
     st.info("PDF 파일을 업로드하세요.")
@@ -166,6 +272,36 @@ if not pdf_items:
 if not pdf_items:
     st.stop()
 
+# 사전 추정: 쪽수·크기·앞쪽 미리보기로 문서별 소요시간·토큰을 추정 (파일·모드별로 한 번만 계산)
+preflight_cache = st.session_state.setdefault("preflight_cache", {})
+preflight_keys = set()
+for mode in run_modes:
+    for (name, content), key in zip(pdf_items, upload_keys):
+        preflight_keys.add((key, mode == "epts"))
+        if (key, mode == "epts") not in preflight_cache:
+            preflight_cache[(key, mode == "epts")] = estimate_pdf_cost(content, is_epts=mode == "epts")
+for key in [k for k in preflight_cache if k not in preflight_keys]:
+    del preflight_cache[key]
+estimates_by_mode = {mode: [preflight_cache[(key, mode == "epts")] for key in upload_keys] for mode in run_modes}
+# 동시 작성이면 문서당 생성 요청이 모드 수만큼이므로 모두 합쳐 추정
+preflight = preflight_batch(
+    [e for mode in run_modes for e in estimates_by_mode[mode]],
+    model=CASCADE_MODELS[0] if cascade_mode else model,
+)
+# 문서별 예상 소요시간 (여러 모드면 가장 긴 모드 기준, 긴 문서 먼저 투입할 때 사용)
+doc_seconds = [
+    max(estimates_by_mode[mode][idx]["예상 소요시간(초)"] for mode in run_modes) for idx in range(len(pdf_items))
+]
+eta_min, eta_sec = divmod(int(preflight["예상 완료 시간(초)"]), 60)
+st.info(
+    f"사전 추정: {len(pdf_items)}건"
+    + (f" × 초록 {len(run_modes)}종" if len(run_modes) > 1 else "")
+    + f" · 총 {sum(e['쪽수'] for e in estimates_by_mode[run_modes[0]]):,}쪽 · "
+    f"예상 완료 약 {eta_min}분 {eta_sec}초 (동시 {PIPELINE_WORKERS}건, 긴 문서 먼저) · "
+    f"예상 비용 약 ${preflight['예상 비용(USD)']:.2f} "
+    f"(입력 {preflight['예상 입력 토큰']:,} / 출력 {preflight['예상 출력 토큰']:,} 토큰)"
+)
+
 run_label = "🚀 초록 생성 실행"
 if st.button(run_label, type="primary"):
     try:
@@ -175,46 +311,209 @@ if st.button(run_label, type="primary"):
         st.error(str(e))
         st.stop()
 
-    results = []
     progress = st.progress(0, text="처리 중...")
     total = len(pdf_items)
-
-    for i, (name, pdf_bytes) in enumerate(pdf_items):
-        if task_mode == "EPIC 정부 보도자료 초록":
-            r = process_one_pdf(client, name, pdf_bytes, prompt=DEFAULT_PROMPT, model=model)
-        else:
-            r = process_one_pdf_epts(client, name, pdf_bytes, model=model)
-
-        results.append(r)
-        progress.progress((i + 1) / total, text=f"처리 중... ({i + 1}/{total})")
+    batch_started = time.time()
+    if memory_profile:
+        # 배치마다 새 리포트
+        stop_profiling(st.session_state.get("mem_profiler"))
+        st.session_state["mem_profiler"] = start_profiling()
+
+    speculative_uploader = st.session_state.get("speculative_uploader")
+    results_by_mode = {mode: [None] * total for mode in run_modes}
+
+    # 검색 인덱스에 같은 PDF·같은 모드·같은 설정(모델·지시문)의 초록이 있으면 API 호출 없이 재사용
+    settings_by_mode = {
+        mode: generation_settings_key(mode, model, cascade=cascade_mode, prompt=DEFAULT_PROMPT) for mode in run_modes
+    }
+    if reuse_index:
+        with closing(open_index()) as conn:
+            for mode in run_modes:
+                for idx, (name, pdf_bytes) in enumerate(pdf_items):
+                    hit = lookup(conn, pdf_bytes, mode, digest=pdf_digests[idx], settings=settings_by_mode[mode])
+                    if hit is None:
+                        continue
+                    # 인덱스에는 전체 텍스트가 있으므로 새로 만든 결과와 같은 미리보기로 자름
+                    text = hit["텍스트파싱 결과"]
+                    results_by_mode[mode][idx] = {
+                        "파일명": name,
+                        "텍스트파싱 결과": (text[:3000] + "...") if len(text) > 3000 else text,
+                        "요약 결과": hit["요약 결과"],
+                        "관리자 경로": admin_url_from_filename(name, is_epts=mode == "epts"),
+                        "오류": None,
+                        "인덱스 재사용": True,
+                        "사용 모델": hit["모델"] or "",
+                    }
+    # 문서별로 아직 만들어야 하는 모드
+    missing_modes = [tuple(m for m in run_modes if results_by_mode[m][idx] is None) for idx in range(total)]
+    if speculative_uploader is not None:
+        for idx, modes in enumerate(missing_modes):
+            if not modes:
+                speculative_uploader.drop(*pdf_items[idx], key=upload_keys[idx])
+    pending = [idx for idx in range(total) if missing_modes[idx]]
+    done = total - len(pending)
+
+    if pack_mode and run_modes == ("epic",) and not cascade_mode:
+        # 짧은 문서는 추출 텍스트를 묶어 요청 (미리 올린 파일은 쓰지 않으므로 정리)
+        if speculative_uploader is not None:
+            for idx in pending:
+                speculative_uploader.drop(*pdf_items[idx], key=upload_keys[idx])
+        packed = iter_packed(
+            client,
+            [pdf_items[idx] for idx in pending],
+            prompt=DEFAULT_PROMPT,
+            model=model,
+            latency_tracker=latency_tracker,
+        )
+        pipelines = [(pending, ((pos, {"epic": r}) for pos, r in packed))]
+    else:
+        # 추출·업로드·생성·삭제를 단계별로 겹쳐 실행 (미리 올라간 파일은 바로 생성 단계로)
+        # 동시 작성이면 문서당 추출·업로드는 한 번, 두 모드 생성은 동시에
+        # 인덱스 재사용으로 일부 모드만 남은 문서는 남은 모드 조합별로 묶어 실행
+        groups: dict[tuple[str, ...], list[int]] = {}
+        for idx in pending:
+            groups.setdefault(missing_modes[idx], []).append(idx)
+        pipelines = []
+        for modes, group in groups.items():
+            # 예상 소요시간이 긴 문서부터 투입해 마지막에 긴 문서 하나만 남는 일을 줄임
+            group_order = sorted(range(len(group)), key=lambda p, g=group: -doc_seconds[g[p]])
+            pipelines.append((group, iter_pipeline_modes(
+                client,
+                [pdf_items[idx] for idx in group],
+                modes=modes,
+                prompt=DEFAULT_PROMPT,
+                model=model,
+                cascade=cascade_mode,
+                uploader=speculative_uploader,
+                latency_tracker=latency_tracker,
+                order=group_order,
+                upload_keys=[upload_keys[idx] for idx in group],
+            )))
+    for group, pipeline in pipelines:
+        # rerun·중지로 중단되면 close → 남은 업로드·생성 API 호출을 건너뜀
+        with closing(pipeline):
+            for pos, rows in pipeline:
+                for mode, r in rows.items():
+                    results_by_mode[mode][group[pos]] = r
+                done += 1
+                progress.progress(done / total, text=f"처리 중... ({done}/{total})")
+
+    # 새로 만든 초록은 검색 인덱스에 저장 (미리보기가 아닌 전체 추출 텍스트를 색인)
+    # 전체 텍스트는 색인에만 쓰고 session_state에 남기지 않음
+    with profile_stage("인덱스 저장"), closing(open_index()) as conn:
+        for idx in pending:
+            for mode in missing_modes[idx]:
+                row = results_by_mode[mode][idx]
+                index_result(
+                    conn, row, mode, pdf_items[idx][1], text=row.pop("추출 텍스트", None),
+                    model=None if cascade_mode else model, digest=pdf_digests[idx], settings=settings_by_mode[mode],
+                )
 
     progress.empty()
-    # 작업 유형과 함께 결과 저장 (작업 유형별로 분리)
-    st.session_state["summary_results"] = results
-    st.session_state["results_task_mode"] = task_mode
+    # 작업 유형별로 결과 저장 (다른 작업 유형의 결과는 그대로 유지)
+    summary_results_by_mode = st.session_state.setdefault("summary_results_by_mode", {})
+    for mode, results in results_by_mode.items():
+        label = MODE_LABELS[mode]
+        summary_results_by_mode[label] = results
+        st.session_state.setdefault("regen_results", {}).pop(label, None)
+        st.session_state.setdefault("zip_payloads", {}).pop(label, None)
+    st.session_state["result_page"] = 1
+    all_rows = [r for results in results_by_mode.values() for r in results]
+    st.session_state["cascade_report"] = summarize_cascade_batch(all_rows) if cascade_mode else None
+    st.session_state["hedge_report"] = latency_tracker.metrics(since=batch_started) if latency_tracker else None
+    st.session_state["endpoint_report"] = client.stats() if isinstance(client, EndpointPool) else None
+    if memory_profile:
+        mem_profiler = st.session_state["mem_profiler"]
+        mem_profiler.note_size("session_state 결과", results_by_mode)
+        mem_profiler.note_size("업로드 PDF 바이트", pdf_items)
+        st.session_state["mem_report_path"] = str(mem_profiler.write_report(MEMORY_REPORT_DIR))
     st.rerun()
 
 
 # -------------------------------------------------
 # 🔵 세션 기본 초기화 추가
 # -------------------------------------------------
-if "summary_results" not in st.session_state:
-    st.session_state["summary_results"] = []
+if "summary_results_by_mode" not in st.session_state:
+    st.session_state["summary_results_by_mode"] = {}
 
 if "regen_results" not in st.session_state:   # 🔵 수정
     st.session_state["regen_results"] = {}
 
+if "zip_payloads" not in st.session_state:
+    st.session_state["zip_payloads"] = {}
+
 if "pdf_items" not in st.session_state:      # 🔵 수정
     st.session_state["pdf_items"] = []
 
-# 작업 유형이 일치하는지 확인 (다른 작업 유형의 결과가 남아있으면 무시)
-if st.session_state.get("results_task_mode") != task_mode:
-    st.info("새로운 작업을 시작하세요. 이전 결과는 다른 작업 유형의 결과입니다.")
+# 동시 작성이면 두 결과 중 볼 쪽 선택 (아래 화면은 선택한 작업 유형 기준)
+if len(run_modes) > 1:
+    task_mode = st.radio(
+        "결과 보기", [MODE_LABELS[mode] for mode in run_modes], horizontal=True, key="result_view_mode"
+    )
+
+# 이 작업 유형으로 처리한 결과가 없으면 안내
+if task_mode not in st.session_state["summary_results_by_mode"]:
+    st.info("새로운 작업을 시작하세요. 이 작업 유형으로 처리한 결과가 없습니다.")
     st.stop()
 
-results = st.session_state["summary_results"]
+results = st.session_state["summary_results_by_mode"][task_mode]
+regen_results = st.session_state["regen_results"].setdefault(task_mode, {})
 st.success(f"총 {len(results)}건 처리 완료.")
 
+# 캐스케이드 모드 배치 리포트
+cascade_report = st.session_state.get("cascade_report")
+if cascade_report:
+    c1, c2, c3 = st.columns(3)
+    c1.metric(
+        "에스컬레이션 비율",
+        f"{cascade_report['에스컬레이션 비율']:.0%}",
+        f"{cascade_report['에스컬레이션 수']}/{cascade_report['문서 수']}건",
+        delta_color="off",
+    )
+    c2.metric(
+        "절감 비용 (gpt-4.1 대비)",
+        f"${cascade_report['절감 비용(USD)']:.4f}",
+        f"실제 ${cascade_report['실제 비용(USD)']:.4f}",
+        delta_color="off",
+    )
+    c3.metric(
+        "절감 시간 (gpt-4.1 대비, 추정)",
+        f"{cascade_report['절감 시간(초)']:.1f}초",
+        f"실제 {cascade_report['실제 소요시간(초)']:.1f}초 · 근거: {cascade_report['절감 시간 근거']}",
+        delta_color="off",
+    )
+
+# 메모리 리포트
+if memory_profile and st.session_state.get("mem_profiler") is not None:
+    with st.expander("🧠 메모리 리포트"):
+        if st.session_state.get("mem_report_path"):
+            st.caption(f"저장 위치: {st.session_state['mem_report_path']}")
+        st.code(st.session_state["mem_profiler"].report_text(), language=None)
+
+# 여러 키·엔드포인트로 나눠 보낸 경우 엔드포인트별 상태
+endpoint_report = st.session_state.get("endpoint_report")
+if endpoint_report:
+    with st.expander(f"🔀 엔드포인트 분산 ({len(endpoint_report)}곳)"):
+        st.dataframe(endpoint_report, hide_index=True, use_container_width=True)
+
+# 헤지 요청 지표
+hedge_report = st.session_state.get("hedge_report")
+if hedge_report and hedge_report["호출 수"]:
+    h1, h2 = st.columns(2)
+    h1.metric(
+        "헤지 비율",
+        f"{hedge_report['헤지 비율']:.0%}",
+        f"{hedge_report['헤지 수']}/{hedge_report['호출 수']}건 (중복 요청 승리 {hedge_report['헤지 승리 수']}건)",
+        delta_color="off",
+    )
+    if hedge_report["p95 개선(초)"] is not None:
+        h2.metric(
+            "p95 생성 시간",
+            f"{hedge_report['실제 p95(초)']:.1f}초",
+            f"헤지 없이 {hedge_report['원 요청 p95(초)']:.1f}초 → {hedge_report['p95 개선(초)']:.1f}초 단축",
+            delta_color="off",
+        )
+
 
 
 # 결과 테이블 + 초록 확인(편집 가능) + txt 다운로드
@@ -226,11 +525,43 @@ if "regen_results" not in st.session_state:
 
 BASE_ADMIN_URL = "https://eiec.kdi.re.kr/aoslwj9584/epic/masterList.do"
 
-for i, row in enumerate(results):
+
+def row_validation_errors(row: dict) -> list[str]:
+    """구조 검증 위반 목록 (캐스케이드 결과는 저장된 값 사용)."""
+    if "검증 오류" in row:
+        return row["검증 오류"]
+    validate = validate_epts_abstract if task_mode == "ETPS 대책자료 초록" else validate_epic_abstract
+    return validate(row.get("요약 결과", ""))
+
+
+# 결과가 많으면 매 rerun마다 전체 위젯을 그리느라 느려지므로, 필터 + 페이지 단위로 현재 페이지만 생성
+RESULT_FILTERS = {
+    "전체": lambda i, row: True,
+    "오류만": lambda i, row: bool(row.get("오류")),
+    "재생성한 항목": lambda i, row: i in regen_results,
+    "검증 실패": lambda i, row: not row.get("오류") and bool(row_validation_errors(row)),
+}
+f1, f2, f3 = st.columns([3, 1, 1])
+result_filter = f1.radio("보기", list(RESULT_FILTERS), horizontal=True, key="result_filter")
+page_size = f2.selectbox("페이지당", [10, 20, 50], index=0, key="result_page_size")
+visible_indices = [i for i, row in enumerate(results) if RESULT_FILTERS[result_filter](i, row)]
+page_count = max(1, -(-len(visible_indices) // page_size))
+# 필터를 바꿔 페이지 수가 줄었으면 마지막 페이지로
+if st.session_state.get("result_page", 1) > page_count:
+    st.session_state["result_page"] = page_count
+page = f3.number_input("페이지", min_value=1, max_value=page_count, step=1, key="result_page")
+page_indices = visible_indices[(page - 1) * page_size:page * page_size]
+st.caption(f"{len(visible_indices)}건 중 {len(page_indices)}건 표시 ({page}/{page_count} 페이지)")
+
+for pos, i in enumerate(page_indices):
+    row = results[i]
 
     with st.expander(
-        f"📄 {row['파일명']}" + (f" — 오류: {row['오류']}" if row.get("오류") else ""),
-        expanded=(i == 0)
+        f"📄 {row['파일명']}"
+        + ((f" (이전 결과 재사용: {row['사용 모델']})" if row.get("사용 모델") else " (이전 결과 재사용)")
+           if row.get("인덱스 재사용") else "")
+        + (f" — 오류: {row['오류']}" if row.get("오류") else ""),
+        expanded=(pos == 0)
     ):
 
         if row.get("오류"):
@@ -298,29 +629,31 @@ for i, row in enumerate(results):
                                 filename,
                                 pdf_bytes,
                                 prompt=DEFAULT_PROMPT,
-                                model=model
+                                model=model,
+                                latency_tracker=latency_tracker,
                             )
                         else:
                             new_result = process_one_pdf_epts(
                                 client,
                                 filename,
                                 pdf_bytes,
-                                model=model
+                                model=model,
+                                latency_tracker=latency_tracker,
                             )
 
                         # 🔵 재생성 결과만 따로 저장
-                        st.session_state["regen_results"][i] = new_result.get("요약 결과", "")
+                        regen_results[i] = new_result.get("요약 결과", "")
 
                         st.rerun()
 
             # 🔵 재생성 결과가 있으면 아래에 추가 표시
-            if i in st.session_state["regen_results"]:
+            if i in regen_results:
                 st.markdown("---")
                 st.markdown("### 🔄 재생성 초록 (NEW)")
 
                 st.text_area(
                     "재생성 초록",
-                    value=st.session_state["regen_results"][i],
+                    value=regen_results[i],
                     height=350,
                     key=f"regen_text_{task_mode}_{i}",
                     disabled=False,
@@ -422,7 +755,7 @@ for i, row in enumerate(results):
             
 
                         
-        # 개별 txt 다운로드 (수정된 내용 반영)
+        # 개별 txt 다운로드 (수정된 내용 반영) — 현재 페이지에 표시되는 행만 만듦
         edit_key = f"summary_edit_{task_mode}_{i}"
         row_for_dl = {**row, "요약 결과": st.session_state.get(edit_key, row.get("요약 결과", ""))}
         txt_content = summary_to_txt_content(row_for_dl)
@@ -448,33 +781,48 @@ for i, row in enumerate(results):
 # 일괄 다운로드 (zip) — 수정된 초록 반영
 st.divider()
 st.subheader("📦 전체 초록 한 번에 받기 (ZIP)")
-zip_buffer = io.BytesIO()
-with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-    for i, row in enumerate(results):
-        if row.get("오류"):
-            continue
-        edit_key = f"summary_edit_{task_mode}_{i}"
-        row_for_zip = {**row, "요약 결과": st.session_state.get(edit_key, row.get("요약 결과", ""))}
-        base = Path(row["파일명"]).stem
-        
-        # 대책명/정책명 추출하여 파일명 생성
-        summary_text = row_for_zip.get("요약 결과", "")
-        title_prefix = extract_title_from_summary(summary_text, task_mode)
-        if title_prefix:
-            name = f"{title_prefix}_{base}.txt"
-        else:
-            name = f"{base}.txt"
-        name = sanitize_filename(name, 100)
-        
-        zf.writestr(name, summary_to_txt_content(row_for_zip))
-zip_buffer.seek(0)
-st.download_button(
-    label="ZIP 파일로 전체 초록 다운로드",
-    data=zip_buffer,
-    file_name="epic_summary_txt.zip",
-    mime="application/zip",
-    key="dl_zip",
-)
+
+
+def build_zip_payload() -> bytes:
+    """전체 결과 ZIP (버튼을 눌렀을 때만 생성)."""
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i, row in enumerate(results):
+            if row.get("오류"):
+                continue
+            edit_key = f"summary_edit_{task_mode}_{i}"
+            row_for_zip = {**row, "요약 결과": st.session_state.get(edit_key, row.get("요약 결과", ""))}
+            base = Path(row["파일명"]).stem
+
+            # 대책명/정책명 추출하여 파일명 생성
+            summary_text = row_for_zip.get("요약 결과", "")
+            title_prefix = extract_title_from_summary(summary_text, task_mode)
+            if title_prefix:
+                name = f"{title_prefix}_{base}.txt"
+            else:
+                name = f"{base}.txt"
+            name = sanitize_filename(name, 100)
+
+            zf.writestr(name, summary_to_txt_content(row_for_zip))
+    return zip_buffer.getvalue()
+
+
+zip_payloads = st.session_state["zip_payloads"]
+if st.button("ZIP 파일 만들기", key=f"build_zip_{task_mode}"):
+    with profile_stage("ZIP 내보내기"):
+        zip_payloads[task_mode] = build_zip_payload()
+    if memory_profile and st.session_state.get("mem_profiler") is not None:
+        mem_profiler = st.session_state["mem_profiler"]
+        mem_profiler.note_size("ZIP 데이터", zip_payloads[task_mode])
+        st.session_state["mem_report_path"] = str(mem_profiler.write_report(MEMORY_REPORT_DIR))
+if zip_payloads.get(task_mode) is not None:
+    st.download_button(
+        label="ZIP 파일로 전체 초록 다운로드",
+        data=zip_payloads[task_mode],
+        file_name="etps_summary_txt.zip" if task_mode == MODE_LABELS["epts"] else "epic_summary_txt.zip",
+        mime="application/zip",
+        key="dl_zip",
+    )
 
 
 
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+summary_core import 시간 회귀 점검
+- `python -X importtime -c "import summary_core"` 결과를 파싱
+- 무거운 의존성(PyMuPDF, OpenAI, Streamlit)이 모듈 import 시점에 불려오면 실패
+- summary_core 누적 import 시간이 예산(기본 150ms)을 넘으면 실패
+
+사용법:
+    python bench_import_time.py            # 기본 예산
+    python bench_import_time.py --budget-ms 100 --repeat 5
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+TARGET_MODULE = "summary_core"
+# 모듈 import 시점에 불려오면 안 되는 최상위 패키지
+HEAVY_MODULES = ("fitz", "pymupdf", "openai", "streamlit", "httpx", "pydantic", "pandas", "numpy")
+DEFAULT_BUDGET_MS = 150.0
+
+
+def measure_import(module: str = TARGET_MODULE) -> tuple[float, set[str]]:
+    """새 인터프리터에서 module을 import하고 (누적 시간 ms, 불려온 최상위 모듈 집합) 반환."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).resolve().parent,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{module} import 실패:\n{proc.stderr.strip()[-2000:]}")
+
+    cumulative_ms = None
+    imported = set()
+    for line in proc.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        imported.add(name.split(".")[0])
+        if name == module:
+            cumulative_ms = int(parts[1]) / 1000
+    if cumulative_ms is None:
+        raise RuntimeError(f"-X importtime 출력에서 {module}을(를) 찾지 못했습니다.")
+    return cumulative_ms, imported
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="summary_core import 시간 회귀 점검")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="누적 import 시간 예산(ms)")
+    parser.add_argument("--repeat", type=int, default=3, help="측정 반복 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+
+    timings = []
+    heavy = set()
+    for _ in range(max(1, args.repeat)):
+        ms, imported = measure_import()
+        timings.append(ms)
+        heavy |= imported & set(HEAVY_MODULES)
+    best = min(timings)
+
+    print(f"{TARGET_MODULE} import: 최소 {best:.1f}ms / 예산 {args.budget_ms:.0f}ms (측정 {len(timings)}회)")
+    failed = False
+    if heavy:
+        print(f"실패: 무거운 모듈이 import 시점에 불려옴: {', '.join(sorted(heavy))}")
+        failed = True
+    if best > args.budget_ms:
+        print(f"실패: import 시간 예산 초과 ({best:.1f}ms > {args.budget_ms:.0f}ms)")
+        failed = True
+    if not failed:
+        print("통과")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+OpenAI 호출 기록/재생 (카세트)
+- CassetteClient는 OpenAI 클라이언트처럼 쓰이며 summary_core가 쓰는 호출만 감싼다:
+  files.create / files.delete / responses.create / chat.completions.create
+- record: 실제 API를 호출하고 요청·응답·실제 소요시간·usage를 JSON 카세트에 저장
+- replay: 네트워크 없이 카세트에서 응답 반환 (realtime=True면 기록된 소요시간만큼 대기)
+- 요청은 모델·메시지·업로드 파일 내용 해시로 구분하므로, 프롬프트를 바꾸면 재생 시 CassetteMiss
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(LookupError):
+    """재생 모드에서 카세트에 없는 요청 (프롬프트·모델·PDF가 기록 이후 바뀜)."""
+
+
+def upload_file_bytes(file_arg) -> tuple[str, bytes]:
+    """files.create(file=...) 인자에서 (파일명, 바이트) 추출. EndpointPool도 같이 씀."""
+    if isinstance(file_arg, tuple):
+        name, fobj = file_arg[0], file_arg[1]
+    else:
+        name, fobj = getattr(file_arg, "name", "upload.pdf"), file_arg
+    if isinstance(fobj, (bytes, bytearray)):
+        return name, bytes(fobj)
+    if hasattr(fobj, "getvalue"):
+        return name, fobj.getvalue()  # BytesIO(bytes)는 복사 없이 원본을 돌려줌
+    data = fobj.read()
+    if hasattr(fobj, "seek"):
+        fobj.seek(0)
+    return name, data
+
+
+class CassetteClient:
+    """
+    OpenAI 클라이언트 대용 기록/재생 래퍼.
+    같은 요청이 여러 번 기록되면 재생 시 기록 순서대로 돌려주고, 다 쓰면 마지막 응답을 반복한다.
+    """
+
+    def __init__(self, path, mode: str = "replay", client=None, realtime: bool = False, speed: float = 1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError("mode는 'record' 또는 'replay'")
+        if mode == "record" and client is None:
+            raise ValueError("record 모드에는 실제 OpenAI 클라이언트가 필요합니다")
+        self.path = Path(path)
+        self.mode = mode
+        self.client = client
+        self.realtime = realtime
+        self.speed = speed
+        self.recorded_latency = 0.0  # 이번 실행에서 재생/기록된 API 소요시간 합계 (초)
+        self._lock = threading.Lock()
+        self._file_hashes: dict[str, str] = {}  # file_id → 내용 해시
+        self._cursor: dict[str, int] = {}
+        self._entries: dict[str, list[dict]] = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self._entries = data.get("entries", {})
+        elif mode == "replay":
+            raise FileNotFoundError(f"카세트 파일을 찾을 수 없습니다: {self.path}")
+        if mode == "record":
+            self._entries = {}  # 다시 기록할 때는 새로 씀
+
+        self.files = SimpleNamespace(create=self._files_create, delete=self._files_delete)
+        self.responses = SimpleNamespace(create=self._responses_create)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat_create))
+
+    # ---- 요청 키 ----
+    def _normalize(self, value):
+        """file_id를 내용 해시로 바꿔 기록·재생 간 같은 요청이 같은 키가 되도록 정규화."""
+        if isinstance(value, dict):
+            return {
+                k: (self._file_hashes.get(v, v) if k == "file_id" else self._normalize(v))
+                for k, v in value.items()
+            }
+        if isinstance(value, (list, tuple)):
+            return [self._normalize(v) for v in value]
+        return value
+
+    def _key(self, method: str, kwargs: dict) -> tuple[str, dict]:
+        request = {k: self._normalize(v) for k, v in kwargs.items() if k != "timeout"}
+        raw = json.dumps([method, request], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest(), request
+
+    # ---- 기록/재생 공통 ----
+    def _call(self, method: str, kwargs: dict, real_call, to_record, from_record):
+        key, request = self._key(method, kwargs)
+        if self.mode == "replay":
+            with self._lock:
+                entries = self._entries.get(key)
+                if not entries:
+                    raise CassetteMiss(f"{method}: 카세트에 없는 요청입니다 (model={request.get('model')}). 다시 기록하세요.")
+                i = self._cursor.get(key, 0)
+                self._cursor[key] = i + 1
+                entry = entries[min(i, len(entries) - 1)]
+                self.recorded_latency += entry["latency"]
+            if self.realtime and entry["latency"] > 0:
+                time.sleep(entry["latency"] / self.speed)
+            return from_record(entry["response"])
+
+        started = time.perf_counter()
+        result = real_call()
+        latency = time.perf_counter() - started
+        entry = {"method": method, "request": request, "response": to_record(result), "latency": latency}
+        with self._lock:
+            self._entries.setdefault(key, []).append(entry)
+            self.recorded_latency += latency
+            self.save()
+        return result
+
+    def save(self) -> None:
+        """카세트 저장 (임시 파일에 쓴 뒤 교체)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(
+            json.dumps({"version": CASSETTE_VERSION, "entries": self._entries}, ensure_ascii=False, indent=1),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+
+    # ---- 감싸는 API ----
+    def _files_create(self, file, purpose, **kwargs):
+        name, data = upload_file_bytes(file)
+        content_hash = "sha256:" + hashlib.sha256(data).hexdigest()
+        kwargs_for_key = {"file": content_hash, "purpose": purpose}
+
+        def real_call():
+            return self.client.files.create(file=(name, data), purpose=purpose, **kwargs)
+
+        result = self._call(
+            "files.create",
+            kwargs_for_key,
+            real_call,
+            to_record=lambda r: {"id": r.id},
+            from_record=lambda rec: SimpleNamespace(id=f"file-replay-{content_hash[7:31]}"),
+        )
+        with self._lock:
+            self._file_hashes[result.id] = content_hash
+        return result
+
+    def _files_delete(self, file_id, **kwargs):
+        kwargs_for_key = {"file_id": file_id}
+
+        def real_call():
+            return self.client.files.delete(file_id, **kwargs)
+
+        try:
+            return self._call(
+                "files.delete",
+                kwargs_for_key,
+                real_call,
+                to_record=lambda r: {"deleted": True},
+                from_record=lambda rec: SimpleNamespace(id=file_id, deleted=rec.get("deleted", True)),
+            )
+        except CassetteMiss:
+            # 정리 호출은 결과에 영향이 없으므로 재생 시 없으면 무시
+            return SimpleNamespace(id=file_id, deleted=True)
+
+    def _responses_create(self, **kwargs):
+        def to_record(r):
+            usage = getattr(r, "usage", None)
+            return {
+                "output_text": r.output_text,
+                "usage": {
+                    "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+                    "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+                },
+            }
+
+        def from_record(rec):
+            return SimpleNamespace(output_text=rec["output_text"], usage=SimpleNamespace(**rec["usage"]))
+
+        return self._call("responses.create", kwargs, lambda: self.client.responses.create(**kwargs), to_record, from_record)
+
+    def _chat_create(self, **kwargs):
+        def to_record(r):
+            usage = getattr(r, "usage", None)
+            return {
+                "content": r.choices[0].message.content,
+                "usage": {
+                    "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+                    "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+                },
+            }
+
+        def from_record(rec):
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=rec["content"]))],
+                usage=SimpleNamespace(**rec["usage"]),
+            )
+
+        return self._call(
+            "chat.completions.create", kwargs, lambda: self.client.chat.completions.create(**kwargs), to_record, from_record
+        )
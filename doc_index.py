@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+처리한 문서·초록 로컬 전문 검색 인덱스 (SQLite FTS5)
+- 문서마다 추출 텍스트, 초록, 심볼 번호(파일명 기반), 작업 모드를 저장
+- 한국어는 띄어쓰기·조사 때문에 단어 단위 토큰이 잘 맞지 않으므로 글자 2-gram으로 색인
+  (예: "기획재정부는" → "기획 획재 재정 정부 부는") → "재정부", "재정" 모두 검색됨
+- 같은 PDF(내용 해시)·같은 모드를 다시 처리하기 전에 lookup으로 이전 결과를 찾아 API 호출 생략
+  (settings를 주면 같은 모델·지시문으로 만든 초록만 재사용)
+"""
+import hashlib
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+from summary_core import symbol_from_filename
+
+DEFAULT_INDEX_PATH = Path(__file__).resolve().parent / "abstract_index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    admin_url TEXT NOT NULL,
+    text TEXT NOT NULL,
+    abstract TEXT NOT NULL,
+    model TEXT,
+    settings TEXT,
+    created_at REAL NOT NULL,
+    UNIQUE (content_hash, mode)
+);
+CREATE INDEX IF NOT EXISTS documents_symbol ON documents(symbol);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    file_name, abstract, text, tokenize = 'unicode61 remove_diacritics 0'
+);
+"""
+
+# 한글·한자 연속 구간은 2-gram, 영문·숫자는 단어 그대로
+_TOKEN_RE = re.compile(r"[가-힣ㄱ-ㅎㅏ-ㅣ一-鿿]+|[A-Za-z0-9]+")
+
+
+def _hangul_run(token: str) -> bool:
+    return not token.isascii()
+
+
+def char_ngrams(text: str, n: int = 2) -> str:
+    """색인·검색용 토큰 문자열 (공백 구분)."""
+    grams = []
+    for token in _TOKEN_RE.findall(text or ""):
+        if not _hangul_run(token):
+            grams.append(token.lower())
+        elif len(token) < n:
+            grams.append(token)
+        else:
+            grams.extend(token[i:i + n] for i in range(len(token) - n + 1))
+    return " ".join(grams)
+
+
+def _fts_query(query: str, n: int = 2) -> str:
+    """검색어를 FTS5 MATCH 식으로 변환 (검색어 단위로 연속된 2-gram 구문을 AND 결합)."""
+    parts = []
+    for token in _TOKEN_RE.findall(query or ""):
+        if _hangul_run(token) and len(token) < n:
+            parts.append(f'"{token}"*')  # 한 글자는 접두 검색
+        else:
+            parts.append('"' + char_ngrams(token, n) + '"')
+    return " AND ".join(parts)
+
+
+def content_hash(pdf_bytes: bytes) -> str:
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def open_index(path=DEFAULT_INDEX_PATH) -> sqlite3.Connection:
+    """인덱스 DB 열기 (없으면 생성)."""
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    # settings 열이 없던 이전 인덱스 (기존 행은 설정을 모르므로 재사용 대상에서 빠짐)
+    if "settings" not in {r["name"] for r in conn.execute("PRAGMA table_info(documents)")}:
+        conn.execute("ALTER TABLE documents ADD COLUMN settings TEXT")
+    return conn
+
+
+def _row_to_result(r: sqlite3.Row) -> dict:
+    return {
+        "파일명": r["file_name"],
+        "모드": r["mode"],
+        "심볼": r["symbol"],
+        "텍스트파싱 결과": r["text"],
+        "요약 결과": r["abstract"],
+        "관리자 경로": r["admin_url"],
+        "모델": r["model"],
+        "등록일시": r["created_at"],
+    }
+
+
+def index_result(
+    conn: sqlite3.Connection,
+    row: dict,
+    mode: str,
+    pdf_bytes: bytes,
+    text: str | None = None,
+    model: str | None = None,
+    digest: str | None = None,
+    settings: str | None = None,
+) -> bool:
+    """
+    처리 결과 한 건 저장 (같은 내용·모드면 최신 결과로 교체). 오류 결과는 저장하지 않음.
+    text를 주지 않으면 결과의 "텍스트파싱 결과"를 색인. digest(content_hash 결과)를 주면 해시를 다시 계산하지 않음.
+    settings(summary_core.generation_settings_key)는 lookup에서 같은 설정인지 확인할 때 씀.
+    """
+    if row.get("오류") or not row.get("요약 결과"):
+        return False
+    text = row.get("텍스트파싱 결과", "") if text is None else text
+    file_name = row["파일명"]
+    values = (
+        digest or content_hash(pdf_bytes),
+        mode,
+        file_name,
+        symbol_from_filename(file_name),
+        row.get("관리자 경로", ""),
+        text,
+        row["요약 결과"],
+        model or row.get("사용 모델"),
+        settings,
+        time.time(),
+    )
+    with conn:
+        old = conn.execute(
+            "SELECT id FROM documents WHERE content_hash = ? AND mode = ?", values[:2]
+        ).fetchone()
+        if old is not None:
+            conn.execute("DELETE FROM documents WHERE id = ?", (old["id"],))
+            conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (old["id"],))
+        cur = conn.execute(
+            "INSERT INTO documents"
+            " (content_hash, mode, file_name, symbol, admin_url, text, abstract, model, settings, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            values,
+        )
+        conn.execute(
+            "INSERT INTO documents_fts (rowid, file_name, abstract, text) VALUES (?, ?, ?, ?)",
+            (cur.lastrowid, char_ngrams(file_name), char_ngrams(row["요약 결과"]), char_ngrams(text)),
+        )
+    return True
+
+
+def lookup(
+    conn: sqlite3.Connection,
+    pdf_bytes: bytes,
+    mode: str,
+    digest: str | None = None,
+    settings: str | None = None,
+) -> dict | None:
+    """
+    같은 PDF·같은 모드로 이미 만든 초록이 있으면 반환. digest를 주면 해시를 다시 계산하지 않음.
+    settings를 주면 같은 설정(모델·지시문)으로 만든 초록만 반환.
+    """
+    r = conn.execute(
+        "SELECT * FROM documents WHERE content_hash = ? AND mode = ?", (digest or content_hash(pdf_bytes), mode)
+    ).fetchone()
+    if r is None or (settings is not None and r["settings"] != settings):
+        return None
+    return _row_to_result(r)
+
+
+def search(conn: sqlite3.Connection, query: str, mode: str | None = None, limit: int = 20) -> list[dict]:
+    """
+    부처명·키워드·심볼 번호로 검색. 심볼 번호와 정확히 같으면 먼저, 나머지는 bm25 관련도 순.
+    mode를 주면 해당 작업 모드만.
+    """
+    query = (query or "").strip()
+    if not query:
+        return []
+    mode_sql, mode_args = ("AND d.mode = ?", [mode]) if mode else ("", [])
+
+    results, seen = [], set()
+    if query.isdigit():
+        for r in conn.execute(
+            f"SELECT d.* FROM documents d WHERE d.symbol = ? {mode_sql} ORDER BY d.created_at DESC LIMIT ?",
+            [query, *mode_args, limit],
+        ):
+            results.append(_row_to_result(r))
+            seen.add(r["id"])
+
+    match = _fts_query(query)
+    if match and len(results) < limit:
+        for r in conn.execute(
+            "SELECT d.* FROM documents_fts f JOIN documents d ON d.id = f.rowid"
+            f" WHERE documents_fts MATCH ? {mode_sql}"
+            " ORDER BY bm25(documents_fts, 2.0, 1.0, 0.5) LIMIT ?",
+            [match, *mode_args, limit],
+        ):
+            if r["id"] not in seen:
+                results.append(_row_to_result(r))
+                seen.add(r["id"])
+    return results[:limit]
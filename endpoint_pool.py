@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+여러 API 키·엔드포인트 분산 (EndpointPool)
+- 키 하나의 rate limit이 처리량 상한이 되지 않도록 여러 프로젝트 키·호환 게이트웨이(base_url)에 나눠 보냄
+- EndpointPool은 OpenAI 클라이언트처럼 쓰이며 summary_core가 쓰는 호출만 감싼다:
+  files.create / files.delete / responses.create / chat.completions.create
+- 엔드포인트마다 진행 중 요청 수, 최근 429, 지연시간(EWMA)을 추적해
+  쿨다운 중이 아닌 엔드포인트 중 가장 한가한 곳으로 보냄
+- 업로드한 file_id는 그 엔드포인트에서만 유효하므로 파일을 참조하는 요청은 파일이 있는 엔드포인트로 보내고,
+  그 엔드포인트가 429·5xx·연결 오류면 다른 엔드포인트에 같은 파일을 올려 이어서 처리 (파일 삭제 시 사본도 정리)
+
+설정 (summary_core.get_client가 읽음):
+    OPENAI_ENDPOINTS 환경변수 또는 Streamlit Secrets — JSON 목록, 또는 그런 JSON 파일 경로
+    [{"name": "proj-a", "api_key": "sk-..."},
+     {"name": "gateway", "api_key": "...", "base_url": "http://10.0.0.5:8000/v1"}]
+로컬 테스트: stub_openai_server.py를 포트별로 여러 개 띄우고 base_url로 지정
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from cassette import upload_file_bytes
+
+# 429를 받으면 Retry-After가 없을 때 이 시간 동안 해당 엔드포인트를 피함 (연속 429면 두 배씩, 최대 MAX)
+RATE_LIMIT_COOLDOWN = 20.0
+MAX_COOLDOWN = 120.0
+# 5xx·연결 오류 후 잠시 피하는 시간
+ERROR_COOLDOWN = 5.0
+# 후보가 모두 쿨다운이면 가장 먼저 풀리는 시각까지 기다렸다가 다시 시도 (요청 하나당 최대 이 시간까지)
+MAX_COOLDOWN_WAIT = 60.0
+# 최근 429로 세는 기간
+RECENT_WINDOW = 60.0
+LATENCY_ALPHA = 0.3
+
+_CONNECTION_ERRORS = ("APIConnectionError", "APITimeoutError")
+
+
+def failover_reason(exc: Exception) -> str | None:
+    """다른 엔드포인트로 넘길 오류면 사유("429", "5xx", "연결"), 아니면 None (잘못된 요청 등은 그대로 올림)."""
+    status = getattr(exc, "status_code", None)
+    if status == 429:
+        return "429"
+    if isinstance(status, int) and status >= 500:
+        return "5xx"
+    if any(cls.__name__ in _CONNECTION_ERRORS for cls in type(exc).__mro__):
+        return "연결"
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return "연결"
+    return None
+
+
+def _retry_after(exc: Exception) -> float | None:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class Endpoint:
+    """엔드포인트 하나의 클라이언트와 상태."""
+
+    def __init__(self, name: str, client):
+        self.name = name
+        self.client = client
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.latency = None  # EWMA (초)
+        self.cooldown_until = 0.0
+        self.rate_limits: list[float] = []  # 429 받은 시각
+        self._streak = 0  # 연속 429 수
+
+    def available(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def recent_rate_limits(self, now: float) -> int:
+        return sum(1 for t in self.rate_limits if now - t <= RECENT_WINDOW)
+
+
+class EndpointPool:
+    """
+    OpenAI 클라이언트 대용 분산 래퍼.
+    clients: [(이름, OpenAI 클라이언트)] — 같은 API를 쓰는 호환 클라이언트면 무엇이든 가능
+    """
+
+    def __init__(self, clients):
+        if not clients:
+            raise ValueError("엔드포인트가 하나 이상 필요합니다")
+        self.endpoints = [Endpoint(name, client) for name, client in clients]
+        self._lock = threading.Lock()
+        # 풀 file_id(처음 올린 엔드포인트의 id) → 파일 내용과 엔드포인트별 사본 id
+        self._files: dict[str, dict] = {}
+
+        self.files = SimpleNamespace(create=self._files_create, delete=self._files_delete)
+        self.responses = SimpleNamespace(create=self._responses_create)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat_create))
+
+    # ---- 선택 ----
+    def _pick(self, candidates: list[Endpoint], exclude: set[str], prefer: set[str] = frozenset()) -> Endpoint | None:
+        """쿨다운이 아닌 후보 중 prefer에 있는 곳을 먼저, 그다음 진행 중 요청이 가장 적은 곳 (같으면 지연시간이 짧은 곳).
+        모두 쿨다운이면 가장 먼저 풀리는 곳."""
+        now = time.time()
+        pool = [e for e in candidates if e.name not in exclude]
+        if not pool:
+            return None
+        healthy = [e for e in pool if e.available(now)]
+        if not healthy:
+            return min(pool, key=lambda e: (e.cooldown_until, e.name not in prefer))
+        return min(
+            healthy, key=lambda e: (e.name not in prefer, e.in_flight, e.latency if e.latency is not None else 0.0)
+        )
+
+    def _call(self, endpoint: Endpoint, fn):
+        with self._lock:
+            endpoint.in_flight += 1
+            endpoint.calls += 1
+        started = time.perf_counter()
+        try:
+            result = fn(endpoint.client)
+        except Exception as e:
+            reason = failover_reason(e)
+            with self._lock:
+                endpoint.failures += 1
+                if reason == "429":
+                    now = time.time()
+                    endpoint.rate_limits = [t for t in endpoint.rate_limits if now - t <= RECENT_WINDOW] + [now]
+                    endpoint._streak += 1
+                    cooldown = _retry_after(e) or min(MAX_COOLDOWN, RATE_LIMIT_COOLDOWN * 2 ** (endpoint._streak - 1))
+                    endpoint.cooldown_until = now + cooldown
+                elif reason is not None:
+                    endpoint.cooldown_until = time.time() + ERROR_COOLDOWN
+            raise
+        finally:
+            with self._lock:
+                endpoint.in_flight -= 1
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            endpoint._streak = 0
+            endpoint.latency = elapsed if endpoint.latency is None else (
+                LATENCY_ALPHA * elapsed + (1 - LATENCY_ALPHA) * endpoint.latency
+            )
+        return result
+
+    def _with_failover(self, candidates: list[Endpoint], fn, prefer: set[str] = frozenset()):
+        """
+        후보 엔드포인트를 차례로 시도. fn(endpoint) → 결과. 넘길 수 없는 오류는 그대로 올림.
+        후보가 모두 실패했거나 쿨다운이면(예: 모든 키가 동시에 429) 가장 먼저 풀리는 시각까지 기다렸다가
+        처음부터 다시 시도하고, MAX_COOLDOWN_WAIT 안에 풀리지 않으면 마지막 오류.
+        """
+        deadline = time.time() + MAX_COOLDOWN_WAIT
+        exclude: set[str] = set()
+        last_error = None
+        while True:
+            endpoint = self._pick(candidates, exclude, prefer)
+            if endpoint is None or not endpoint.available(time.time()):
+                # 남은 후보가 없거나 모두 쿨다운: 실패했던 곳까지 포함해 가장 먼저 풀리는 곳을 기다림
+                exclude.clear()
+                endpoint = self._pick(candidates, exclude, prefer)
+            now = time.time()
+            if not endpoint.available(now):
+                if last_error is not None and endpoint.cooldown_until > deadline:
+                    raise last_error
+                time.sleep(max(0.0, min(endpoint.cooldown_until, deadline) - now))
+            try:
+                return fn(endpoint)
+            except Exception as e:
+                if failover_reason(e) is None:
+                    raise
+                last_error = e
+                exclude.add(endpoint.name)
+
+    # ---- 파일 ----
+    def _files_create(self, file, purpose, **kwargs):
+        name, data = upload_file_bytes(file)
+
+        def upload(endpoint):
+            return endpoint, self._call(endpoint, lambda c: c.files.create(file=(name, data), purpose=purpose, **kwargs))
+
+        endpoint, result = self._with_failover(self.endpoints, upload)
+        with self._lock:
+            self._files[result.id] = {
+                "name": name, "data": data, "purpose": purpose, "copies": {endpoint.name: result.id},
+            }
+        return result
+
+    def _copy_file(self, file_id: str, endpoint: Endpoint) -> str:
+        """file_id 파일을 endpoint에도 올리고 그곳의 id 반환 (이미 있으면 그대로)."""
+        with self._lock:
+            record = self._files[file_id]
+            remote_id = record["copies"].get(endpoint.name)
+        if remote_id is not None:
+            return remote_id
+        uploaded = self._call(
+            endpoint, lambda c: c.files.create(file=(record["name"], record["data"]), purpose=record["purpose"])
+        )
+        with self._lock:
+            record["copies"][endpoint.name] = uploaded.id
+        return uploaded.id
+
+    def _files_delete(self, file_id, **kwargs):
+        with self._lock:
+            record = self._files.pop(file_id, None)
+        if record is None:
+            # 풀 밖에서 만든 id — 어디에 있는지 모르므로 첫 엔드포인트로
+            return self.endpoints[0].client.files.delete(file_id, **kwargs)
+        by_name = {e.name: e for e in self.endpoints}
+        result = None
+        for endpoint_name, remote_id in record["copies"].items():
+            try:
+                r = by_name[endpoint_name].client.files.delete(remote_id, **kwargs)
+                result = r if remote_id == file_id else result
+            except Exception:
+                pass  # 사본 정리 실패는 무시
+        return result
+
+    # ---- 생성 ----
+    def _file_ids(self, value) -> set[str]:
+        if isinstance(value, dict):
+            found = {value["file_id"]} if isinstance(value.get("file_id"), str) else set()
+            for v in value.values():
+                found |= self._file_ids(v)
+            return found
+        if isinstance(value, (list, tuple)):
+            return set().union(*(self._file_ids(v) for v in value)) if value else set()
+        return set()
+
+    @staticmethod
+    def _rewrite(value, mapping: dict[str, str]):
+        if isinstance(value, dict):
+            return {
+                k: (mapping.get(v, v) if k == "file_id" else EndpointPool._rewrite(v, mapping))
+                for k, v in value.items()
+            }
+        if isinstance(value, (list, tuple)):
+            return [EndpointPool._rewrite(v, mapping) for v in value]
+        return value
+
+    def _responses_create(self, **kwargs):
+        with self._lock:
+            file_ids = [f for f in self._file_ids(kwargs.get("input")) if f in self._files]
+            holders = {name for f in file_ids for name in self._files[f]["copies"]}
+        if not file_ids:
+            return self._with_failover(
+                self.endpoints, lambda e: self._call(e, lambda c: c.responses.create(**kwargs))
+            )
+
+        def generate(endpoint):
+            mapping = {f: self._copy_file(f, endpoint) for f in file_ids}
+            request = {**kwargs, "input": self._rewrite(kwargs["input"], mapping)}
+            return self._call(endpoint, lambda c: c.responses.create(**request))
+
+        # 파일이 이미 있는 엔드포인트를 먼저, 모두 막혔으면 나머지 엔드포인트에 사본을 올려 시도
+        return self._with_failover(self.endpoints, generate, prefer=holders)
+
+    def _chat_create(self, **kwargs):
+        return self._with_failover(
+            self.endpoints, lambda e: self._call(e, lambda c: c.chat.completions.create(**kwargs))
+        )
+
+    # ---- 상태 ----
+    def stats(self) -> list[dict]:
+        """엔드포인트별 상태 (화면 표시용)."""
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    "엔드포인트": e.name,
+                    "진행 중": e.in_flight,
+                    "호출 수": e.calls,
+                    "실패 수": e.failures,
+                    "최근 429": e.recent_rate_limits(now),
+                    "평균 지연(초)": round(e.latency, 2) if e.latency is not None else None,
+                    "쿨다운 남은 시간(초)": round(max(0.0, e.cooldown_until - now), 1),
+                }
+                for e in self.endpoints
+            ]
+
+
+def parse_endpoint_config(raw) -> list[dict]:
+    """
+    엔드포인트 설정 읽기. raw: JSON 문자열, JSON 파일 경로, 또는 dict 목록 (Streamlit Secrets).
+    각 항목: api_key (필수), base_url, name, max_retries
+    """
+    if isinstance(raw, str):
+        text = raw.strip()
+        if not text.startswith("["):
+            text = Path(text).read_text(encoding="utf-8")
+        raw = json.loads(text)
+    entries = []
+    for i, item in enumerate(raw or []):
+        item = dict(item)
+        if not item.get("api_key"):
+            raise ValueError(f"엔드포인트 설정 {i + 1}번째 항목에 api_key가 없습니다")
+        item.setdefault("name", item.get("base_url") or f"endpoint-{i + 1}")
+        entries.append(item)
+    return entries
+
+
+def build_pool(entries: list[dict]) -> EndpointPool:
+    """설정 항목으로 OpenAI 클라이언트를 만들어 EndpointPool 구성.
+    재시도는 풀이 다른 엔드포인트로 넘기거나 쿨다운이 풀릴 때까지 기다리며 하므로 SDK 자체 재시도는 기본 0회."""
+    from openai import OpenAI
+
+    clients = []
+    for item in entries:
+        client = OpenAI(
+            api_key=item["api_key"],
+            base_url=item.get("base_url") or os.environ.get("OPENAI_BASE_URL") or None,
+            max_retries=int(item.get("max_retries", 0)),
+        )
+        clients.append((item["name"], client))
+    return EndpointPool(clients)
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+골든셋 회귀 점검 (카세트 기반, 네트워크 없이 실행)
+- record: 실제 API로 PDF마다 초록을 생성해 카세트(<이름>.<모드>.json)와 골든 출력(<이름>.<모드>.txt) 저장
+- check : 카세트를 재생해 같은 초록이 나오는지, 파이프라인 자체 오버헤드가 예산 안인지 확인
+          (재생은 즉시 응답하므로 측정 시간 = 추출·검증 등 우리 코드의 시간)
+
+사용법:
+    python golden_runner.py record --pdf-dir golden/pdf --golden-dir golden/expected --mode epic
+    python golden_runner.py check  --pdf-dir golden/pdf --golden-dir golden/expected --mode epic
+    python golden_runner.py check  ... --realtime     # 기록된 API 소요시간만큼 대기하며 재생
+"""
+import argparse
+import difflib
+import sys
+import time
+from pathlib import Path
+
+from cassette import CassetteClient
+from summary_core import DEFAULT_PROMPT, get_client, process_one_pdf, process_one_pdf_epts
+
+DEFAULT_MAX_OVERHEAD_MS = 500.0
+
+
+def _run_one(client, pdf_path: Path, mode: str, model: str) -> dict:
+    pdf_bytes = pdf_path.read_bytes()
+    if mode == "epts":
+        return process_one_pdf_epts(client, pdf_path.name, pdf_bytes, model=model)
+    return process_one_pdf(client, pdf_path.name, pdf_bytes, prompt=DEFAULT_PROMPT, model=model)
+
+
+def record(pdf_dir: Path, golden_dir: Path, mode: str, model: str) -> int:
+    real_client = get_client()
+    golden_dir.mkdir(parents=True, exist_ok=True)
+    failed = 0
+    for pdf_path in sorted(pdf_dir.glob("*.pdf")):
+        cassette = CassetteClient(golden_dir / f"{pdf_path.stem}.{mode}.json", mode="record", client=real_client)
+        result = _run_one(cassette, pdf_path, mode, model)
+        if result["오류"]:
+            print(f"[오류] {pdf_path.name}: {result['오류']}")
+            failed += 1
+            continue
+        (golden_dir / f"{pdf_path.stem}.{mode}.txt").write_text(result["요약 결과"], encoding="utf-8")
+        print(f"[기록] {pdf_path.name} (API {cassette.recorded_latency:.1f}초)")
+    return 1 if failed else 0
+
+
+def check(pdf_dir: Path, golden_dir: Path, mode: str, model: str, realtime: bool, max_overhead_ms: float) -> int:
+    failed = 0
+    total_wall = total_api = 0.0
+    pdf_paths = sorted(pdf_dir.glob("*.pdf"))
+    for pdf_path in pdf_paths:
+        cassette_path = golden_dir / f"{pdf_path.stem}.{mode}.json"
+        expected_path = golden_dir / f"{pdf_path.stem}.{mode}.txt"
+        if not cassette_path.exists() or not expected_path.exists():
+            print(f"[누락] {pdf_path.name}: 카세트/골든 출력 없음 (record 먼저 실행)")
+            failed += 1
+            continue
+
+        cassette = CassetteClient(cassette_path, mode="replay", realtime=realtime)
+        started = time.perf_counter()
+        result = _run_one(cassette, pdf_path, mode, model)
+        wall = time.perf_counter() - started
+        # realtime 재생이면 기록된 API 시간을 빼야 파이프라인 자체 시간
+        overhead = wall - (cassette.recorded_latency if realtime else 0.0)
+        total_wall += wall
+        total_api += cassette.recorded_latency
+
+        status = "통과"
+        if result["오류"]:
+            status = f"오류: {result['오류']}"
+        else:
+            expected = expected_path.read_text(encoding="utf-8")
+            if result["요약 결과"] != expected:
+                status = "출력 불일치"
+                diff = difflib.unified_diff(
+                    expected.splitlines(), result["요약 결과"].splitlines(), "golden", "current", lineterm=""
+                )
+                print("\n".join(diff))
+        if status == "통과" and overhead * 1000 > max_overhead_ms:
+            status = f"오버헤드 초과 ({overhead * 1000:.0f}ms > {max_overhead_ms:.0f}ms)"
+        if status != "통과":
+            failed += 1
+        print(f"[{status}] {pdf_path.name}  오버헤드 {overhead * 1000:.1f}ms  (기록된 API {cassette.recorded_latency:.1f}초)")
+
+    print(
+        f"\n{len(pdf_paths)}건 중 실패 {failed}건 / 전체 {total_wall:.2f}초"
+        f" (기록된 API 시간 합계 {total_api:.1f}초)"
+    )
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="카세트 기반 골든셋 회귀 점검")
+    parser.add_argument("command", choices=["record", "check"])
+    parser.add_argument("--pdf-dir", type=Path, required=True)
+    parser.add_argument("--golden-dir", type=Path, required=True)
+    parser.add_argument("--mode", choices=["epic", "epts"], default="epic")
+    parser.add_argument("--model", default="gpt-4.1")
+    parser.add_argument("--realtime", action="store_true", help="기록된 API 소요시간만큼 대기하며 재생")
+    parser.add_argument("--max-overhead-ms", type=float, default=DEFAULT_MAX_OVERHEAD_MS, help="문서당 파이프라인 오버헤드 예산")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        return record(args.pdf_dir, args.golden_dir, args.mode, args.model)
+    return check(args.pdf_dir, args.golden_dir, args.mode, args.model, args.realtime, args.max_overhead_ms)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
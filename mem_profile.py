@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+배치 메모리 프로파일링 (선택 기능)
+- 단계별(PDF 추출, 업로드, 생성, ZIP 내보내기 등)로 tracemalloc 스냅샷 차이와 RSS를 기록
+- 배치가 끝나면 단계별 최대 사용량과 상위 할당 위치를 담은 리포트 작성
+- 켜져 있지 않으면 profile_stage는 아무것도 하지 않음 (비용 없음)
+
+사용:
+    profiler = start_profiling()
+    with profile_stage("추출"):
+        ...
+    stop_profiling(profiler)
+    profiler.write_report("memory_reports")
+
+프로파일러는 시작한 컨텍스트(Streamlit에서는 세션의 스크립트 실행 스레드)에만 활성화되므로
+다른 세션의 profile_stage는 기록되지 않고, 다른 세션의 stop_profiling이 이 프로파일러를 끄지 않는다.
+작업 스레드에서도 같은 프로파일러에 기록하려면 bind_profiler로 감싼 함수를 넘긴다.
+tracemalloc은 프로세스에 하나이므로 켜져 있는 프로파일러가 하나라도 있으면 계속 추적한다.
+
+주의: tracemalloc은 프로세스 전체를 추적하므로 여러 단계나 여러 세션이 동시에 돌면
+단계별 수치에 다른 단계·세션의 할당이 섞일 수 있다. RSS는 프로세스 전체 값이다.
+"""
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+
+ENV_FLAG = "EPIC_MEMORY_PROFILE"
+RSS_SAMPLE_INTERVAL = 0.05
+# 프로파일러 자신(tracemalloc, 샘플링 스레드)의 할당은 리포트에서 제외
+_SELF_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, threading.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+_active: contextvars.ContextVar = contextvars.ContextVar("active_memory_profiler", default=None)
+# tracemalloc을 쓰고 있는 프로파일러 수 (0이 되면, 직접 켠 경우에만 끔)
+_tracing_users = 0
+_tracing_owned = False
+_tracing_lock = threading.Lock()
+
+
+def _acquire_tracing() -> None:
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def _release_tracing() -> None:
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+def current_rss() -> int | None:
+    """현재 프로세스 RSS(bytes). 알 수 없으면 None."""
+    try:
+        import psutil  # 있으면 사용 (Windows 포함)
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _deep_size(obj, seen=None) -> int:
+    """dict/list/str 위주의 객체 대략 크기 (session_state 결과 측정용)."""
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_deep_size(v, seen) for v in obj)
+    return size
+
+
+def _fmt_bytes(n) -> str:
+    if n is None:
+        return "-"
+    for unit in ("B", "KB", "MB"):
+        if abs(n) < 1024:
+            return f"{n:.0f}{unit}"
+        n /= 1024
+    return f"{n:.1f}GB"
+
+
+class MemoryProfiler:
+    """단계별 tracemalloc 스냅샷 + RSS 샘플링."""
+
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self.started_at = time.time()
+        self._tracing: weakref.finalize | None = None
+        self._lock = threading.Lock()
+        self.stages: dict[str, dict] = {}
+        self.sizes: dict[str, int] = {}
+
+    def start(self) -> None:
+        # 세션이 stop 없이 끝나 프로파일러가 버려져도 tracemalloc 사용 수를 돌려놓도록 finalize로 반납
+        if self._tracing is None or not self._tracing.alive:
+            _acquire_tracing()
+            self._tracing = weakref.finalize(self, _release_tracing)
+
+    def stop(self) -> None:
+        if self._tracing is not None:
+            self._tracing()
+            self._tracing = None
+
+    @contextmanager
+    def stage(self, name: str):
+        if not tracemalloc.is_tracing():
+            yield
+            return
+        before = tracemalloc.take_snapshot().filter_traces(_SELF_FILTERS)
+        traced_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        rss_before = current_rss()
+        rss_peak = [rss_before or 0]
+        stop_sampling = threading.Event()
+
+        def sample():
+            while not stop_sampling.wait(RSS_SAMPLE_INTERVAL):
+                rss = current_rss()
+                if rss is not None and rss > rss_peak[0]:
+                    rss_peak[0] = rss
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            stop_sampling.set()
+            sampler.join()
+            _, traced_peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(_SELF_FILTERS)
+            diffs = after.compare_to(before, "lineno")[: self.top_n]
+            self._record(
+                name,
+                seconds=time.perf_counter() - started,
+                peak=traced_peak - traced_before,
+                rss_before=rss_before,
+                rss_peak=rss_peak[0] or None,
+                sites=[(str(d.traceback[0]), d.size_diff, d.count_diff) for d in diffs if d.size_diff > 0],
+            )
+
+    def _record(self, name, seconds, peak, rss_before, rss_peak, sites) -> None:
+        with self._lock:
+            st = self.stages.setdefault(name, {
+                "호출 수": 0, "소요시간(초)": 0.0, "최대 추적 메모리": 0,
+                "최대 RSS": None, "최대 RSS 증가": 0, "할당 위치": {},
+            })
+            st["호출 수"] += 1
+            st["소요시간(초)"] += seconds
+            st["최대 추적 메모리"] = max(st["최대 추적 메모리"], peak)
+            if rss_peak is not None:
+                st["최대 RSS"] = max(st["최대 RSS"] or 0, rss_peak)
+                st["최대 RSS 증가"] = max(st["최대 RSS 증가"], rss_peak - (rss_before or rss_peak))
+            for site, size, count in sites:
+                agg = st["할당 위치"].setdefault(site, [0, 0])
+                agg[0] += size
+                agg[1] += count
+
+    def note_size(self, name: str, obj) -> None:
+        """session_state 결과처럼 오래 살아 있는 객체의 대략 크기 기록."""
+        self.sizes[name] = _deep_size(obj)
+
+    def report(self) -> dict:
+        stages = {}
+        for name, st in self.stages.items():
+            sites = sorted(st["할당 위치"].items(), key=lambda kv: -kv[1][0])[: self.top_n]
+            stages[name] = {
+                **{k: v for k, v in st.items() if k != "할당 위치"},
+                "상위 할당 위치": [{"위치": s, "증가 bytes": size, "블록 수": count} for s, (size, count) in sites],
+            }
+        return {
+            "시작": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started_at)),
+            "현재 RSS": current_rss(),
+            "단계": stages,
+            "객체 크기": self.sizes,
+        }
+
+    def report_text(self) -> str:
+        rep = self.report()
+        lines = [f"메모리 리포트 ({rep['시작']}) · 현재 RSS {_fmt_bytes(rep['현재 RSS'])}", ""]
+        ordered = sorted(rep["단계"].items(), key=lambda kv: -kv[1]["최대 추적 메모리"])
+        for name, st in ordered:
+            lines.append(
+                f"[{name}] {st['호출 수']}회 · 최대 추적 {_fmt_bytes(st['최대 추적 메모리'])}"
+                f" · 최대 RSS {_fmt_bytes(st['최대 RSS'])} (+{_fmt_bytes(st['최대 RSS 증가'])})"
+                f" · {st['소요시간(초)']:.1f}초"
+            )
+            for site in st["상위 할당 위치"]:
+                lines.append(f"    {_fmt_bytes(site['증가 bytes']):>8}  {site['블록 수']:>6}블록  {site['위치']}")
+        if rep["객체 크기"]:
+            lines.append("")
+            for name, size in rep["객체 크기"].items():
+                lines.append(f"[객체] {name}: {_fmt_bytes(size)}")
+        return "\n".join(lines)
+
+    def write_report(self, out_dir) -> Path:
+        """리포트를 txt/json으로 저장하고 txt 경로 반환."""
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        stem = "memory_" + time.strftime("%Y%m%d_%H%M%S", time.localtime(self.started_at))
+        (out_dir / f"{stem}.json").write_text(json.dumps(self.report(), ensure_ascii=False, indent=1), encoding="utf-8")
+        path = out_dir / f"{stem}.txt"
+        path.write_text(self.report_text(), encoding="utf-8")
+        return path
+
+
+def start_profiling(top_n: int = 10) -> MemoryProfiler:
+    """프로파일링 시작 (현재 컨텍스트의 profile_stage가 이 프로파일러에 기록)."""
+    profiler = MemoryProfiler(top_n=top_n)
+    profiler.start()
+    _active.set(profiler)
+    return profiler
+
+
+def resume_profiling(profiler: MemoryProfiler) -> None:
+    """이전 배치의 프로파일러에 이어서 기록 (예: Streamlit rerun 뒤 결과 화면의 ZIP 내보내기)."""
+    profiler.start()
+    _active.set(profiler)
+
+
+def stop_profiling(profiler: MemoryProfiler | None = None) -> MemoryProfiler | None:
+    """profiler(주지 않으면 현재 컨텍스트의 프로파일러)를 멈춤. 다른 세션의 프로파일러에는 영향 없음."""
+    current = _active.get()
+    profiler = profiler if profiler is not None else current
+    if profiler is not None:
+        if profiler is current:
+            _active.set(None)
+        profiler.stop()
+    return profiler
+
+
+def bind_profiler(fn):
+    """현재 컨텍스트의 프로파일러를 작업 스레드에서도 쓰도록 fn을 감쌈 (프로파일링 중이 아니면 fn 그대로)."""
+    profiler = _active.get()
+    if profiler is None:
+        return fn
+
+    def run(*args, **kwargs):
+        token = _active.set(profiler)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _active.reset(token)
+
+    return run
+
+
+def profiling_requested() -> bool:
+    """환경변수 EPIC_MEMORY_PROFILE=1이면 프로파일링 요청으로 봄."""
+    return os.environ.get(ENV_FLAG, "").strip() not in ("", "0", "false", "False")
+
+
+@contextmanager
+def profile_stage(name: str):
+    """현재 컨텍스트에서 프로파일링 중이면 name 단계로 기록, 아니면 그대로 실행."""
+    profiler = _active.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
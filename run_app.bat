@@ -2,12 +2,16 @@
 chcp 65001 >nul
 cd /d "%~dp0"
 echo [1/2] 필요한 패키지 확인 중...
+rem 이미 설치되어 있으면 pip 설치를 건너뜀 (매 실행마다 재설치하지 않도록)
+python -c "import streamlit, fitz, openai" >nul 2>&1
+if not errorlevel 1 goto run_app
 python -m pip install -r requirements_app.txt -q
 if errorlevel 1 (
     echo 패키지 설치에 실패했습니다. Python이 설치되어 있는지 확인해 주세요.
     pause
     exit /b 1
 )
+:run_app
 echo [2/2] EPIC 초록 앱을 시작합니다. 브라우저가 자동으로 열립니다.
 echo 종료하려면 이 창을 닫거나 Ctrl+C를 누르세요.
 echo.
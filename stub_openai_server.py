@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 OpenAI 호환 대역 서버 (EndpointPool 분산·장애 전환 점검용)
+- summary_core가 쓰는 API만 흉내: POST /v1/files, DELETE /v1/files/{id},
+  POST /v1/responses, POST /v1/chat/completions
+- 분당 요청 한도(--rpm)를 넘으면 429 + Retry-After, --fail-rate 비율로 500 반환
+- 이 서버에 올라오지 않은 file_id를 참조하면 404 (엔드포인트별 file_id 라우팅 확인용)
+- 응답 초록에 서버 이름을 넣어 어느 엔드포인트가 처리했는지 알 수 있음
+
+사용법 (엔드포인트 3개):
+    python stub_openai_server.py --port 8701 --name a --rpm 30
+    python stub_openai_server.py --port 8702 --name b --latency 2
+    python stub_openai_server.py --port 8703 --name c --fail-rate 0.2
+    set OPENAI_ENDPOINTS=[{"name":"a","api_key":"x","base_url":"http://127.0.0.1:8701/v1"}, ...]
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_ABSTRACT = (
+    "환경부는 ’26.7.30.(월) {name} 대역 서버에서 초록을 생성했다고 밝혔다.\n\n"
+    "- 첫째 내용을 요약함.\n\n"
+    "- 둘째 내용을 요약함.\n\n"
+    "- 환경부는 향후 관련 제도를 개선할 계획임."
+)
+
+
+class StubState:
+    """대역 서버 하나의 설정과 상태."""
+
+    def __init__(self, name: str, rpm: int = 0, latency: float = 0.0, fail_rate: float = 0.0):
+        self.name = name
+        self.rpm = rpm
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.files: set[str] = set()
+        self.requests: list[float] = []
+        self.counts = {"files": 0, "responses": 0, "chat": 0, "429": 0, "500": 0}
+        self.lock = threading.Lock()
+
+    def admit(self) -> float | None:
+        """요청을 받을 수 있으면 None, 한도 초과면 Retry-After(초)."""
+        now = time.time()
+        with self.lock:
+            self.requests = [t for t in self.requests if now - t < 60]
+            if self.rpm and len(self.requests) >= self.rpm:
+                self.counts["429"] += 1
+                return max(1.0, 60 - (now - self.requests[0]))
+            self.requests.append(now)
+        return None
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    state: StubState  # make_stub_server에서 지정
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict, headers: dict | None = None) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, message: str, code: str, headers: dict | None = None) -> None:
+        self._send_json(status, {"error": {"message": message, "type": code, "code": code}}, headers)
+
+    def _gate(self) -> bool:
+        """한도·장애 주입. 계속 처리하면 True."""
+        retry_after = self.state.admit()
+        if retry_after is not None:
+            self._error(
+                HTTPStatus.TOO_MANY_REQUESTS, f"{self.state.name}: rate limit", "rate_limit_exceeded",
+                headers={"Retry-After": f"{retry_after:.0f}"},
+            )
+            return False
+        if self.state.fail_rate and random.random() < self.state.fail_rate:
+            with self.state.lock:
+                self.state.counts["500"] += 1
+            self._error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{self.state.name}: injected failure", "server_error")
+            return False
+        if self.state.latency:
+            time.sleep(self.state.latency * random.uniform(0.8, 1.2))
+        return True
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def do_POST(self):
+        path = self.path.split("?")[0].rstrip("/")
+        body = self._read_body()
+        if path == "/v1/files":
+            if not self._gate():
+                return
+            file_id = f"file-{self.state.name}-{uuid.uuid4().hex[:16]}"
+            with self.state.lock:
+                self.state.files.add(file_id)
+                self.state.counts["files"] += 1
+            return self._send_json(HTTPStatus.OK, {
+                "id": file_id, "object": "file", "bytes": len(body), "created_at": int(time.time()),
+                "filename": "upload.pdf", "purpose": "assistants", "status": "processed",
+            })
+        if path not in ("/v1/responses", "/v1/chat/completions"):
+            return self._error(HTTPStatus.NOT_FOUND, "not found", "not_found")
+
+        request = json.loads(body or b"{}")
+        missing = [
+            f for f in re.findall(r'"file_id":\s*"([^"]+)"', body.decode("utf-8", "replace"))
+            if f not in self.state.files
+        ]
+        if missing:
+            return self._error(HTTPStatus.NOT_FOUND, f"No such File object: {missing[0]}", "invalid_request_error")
+        if not self._gate():
+            return
+        text = STUB_ABSTRACT.format(name=self.state.name)
+        model = request.get("model", "stub")
+        if path == "/v1/responses":
+            with self.state.lock:
+                self.state.counts["responses"] += 1
+            return self._send_json(HTTPStatus.OK, {
+                "id": f"resp-{uuid.uuid4().hex[:16]}", "object": "response", "created_at": int(time.time()),
+                "model": model, "status": "completed", "error": None, "incomplete_details": None,
+                "instructions": None, "metadata": {}, "parallel_tool_calls": True, "temperature": 1.0,
+                "tool_choice": "auto", "tools": [], "top_p": 1.0,
+                "output": [{
+                    "type": "message", "id": f"msg-{uuid.uuid4().hex[:16]}", "status": "completed",
+                    "role": "assistant", "content": [{"type": "output_text", "text": text, "annotations": []}],
+                }],
+                "usage": {
+                    "input_tokens": len(body) // 4, "output_tokens": len(text),
+                    "total_tokens": len(body) // 4 + len(text),
+                    "input_tokens_details": {"cached_tokens": 0}, "output_tokens_details": {"reasoning_tokens": 0},
+                },
+            })
+        with self.state.lock:
+            self.state.counts["chat"] += 1
+        return self._send_json(HTTPStatus.OK, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:16]}", "object": "chat.completion", "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(body) // 4, "completion_tokens": len(text), "total_tokens": len(body) // 4 + len(text)},
+        })
+
+    def do_DELETE(self):
+        m = re.fullmatch(r"/v1/files/([\w-]+)", self.path.rstrip("/"))
+        if not m:
+            return self._error(HTTPStatus.NOT_FOUND, "not found", "not_found")
+        with self.state.lock:
+            existed = m.group(1) in self.state.files
+            self.state.files.discard(m.group(1))
+        if not existed:
+            return self._error(HTTPStatus.NOT_FOUND, f"No such File object: {m.group(1)}", "invalid_request_error")
+        self._send_json(HTTPStatus.OK, {"id": m.group(1), "object": "file", "deleted": True})
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/healthz":
+            with self.state.lock:
+                body = {"name": self.state.name, "live_files": len(self.state.files), **self.state.counts}
+            return self._send_json(HTTPStatus.OK, body)
+        self._error(HTTPStatus.NOT_FOUND, "not found", "not_found")
+
+
+def make_stub_server(state: StubState, host: str = "127.0.0.1", port: int = 8701) -> ThreadingHTTPServer:
+    handler = type("BoundStubRequestHandler", (StubRequestHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="로컬 OpenAI 호환 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8701)
+    parser.add_argument("--name", default=None, help="응답에 넣을 서버 이름 (기본: 포트 번호)")
+    parser.add_argument("--rpm", type=int, default=0, help="분당 요청 한도 (0이면 무제한, 넘으면 429)")
+    parser.add_argument("--latency", type=float, default=0.0, help="요청당 지연 (초, ±20%%)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="500을 돌려줄 비율")
+    args = parser.parse_args()
+
+    state = StubState(args.name or str(args.port), rpm=args.rpm, latency=args.latency, fail_rate=args.fail_rate)
+    server = make_stub_server(state, args.host, args.port)
+    print(f"대역 서버 {state.name}: http://{args.host}:{args.port}/v1 (rpm {args.rpm or '무제한'}, 지연 {args.latency}초)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
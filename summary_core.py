@@ -3,15 +3,32 @@
 EPIC PDF 초록 생성 핵심 로직 (노트북 summary_project_0212.ipynb 기반)
 - PDF 텍스트 추출: PyMuPDF(fitz) 사용
 - OpenAI GPT로 정부 보도자료 형식 초록 생성
+- fitz / openai / streamlit은 무거우므로 실제로 쓰는 함수 안에서만 import
+  (워커·CLI에서 모듈만 불러올 때 수 초씩 걸리지 않도록. bench_import_time.py로 확인)
 """
+from __future__ import annotations
+
 import os
 import re
+import json
+import math
 import io
+import time
+import queue
+import atexit
+import hashlib
+import threading
+import weakref
+from contextlib import closing
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from endpoint_pool import EndpointPool, build_pool, parse_endpoint_config
+from mem_profile import bind_profiler, profile_stage
 
-import fitz  # PyMuPDF
-import streamlit as st
-from openai import OpenAI
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 
 # 기본 프롬프트 (노트북 summary_project_0212.ipynb와 동일)
@@ -183,9 +200,40 @@ SYSTEM_RULES_EPTS = """
 #     with open(path, "r", encoding="utf-8") as f:
 #         api_key = f.read().strip()
 #     return OpenAI(api_key=api_key)
-def get_client() -> OpenAI:
-    """Streamlit Secrets에서 API 키를 읽어 OpenAI 클라이언트 반환."""
-    api_key = st.secrets["OPENAI_API_KEY"]
+_POOLS: dict[str, EndpointPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _pooled_client(raw) -> EndpointPool:
+    """같은 엔드포인트 설정이면 같은 EndpointPool 재사용 (업로드 file_id 라우팅·429 쿨다운 상태 유지)."""
+    entries = parse_endpoint_config(raw)
+    key = json.dumps(entries, sort_keys=True)
+    with _POOLS_LOCK:
+        if key not in _POOLS:
+            _POOLS[key] = build_pool(entries)
+        return _POOLS[key]
+
+
+def get_client(api_key: str | None = None) -> OpenAI | EndpointPool:
+    """
+    OpenAI 클라이언트 반환.
+    api_key를 주지 않으면 환경변수(OPENAI_ENDPOINTS → OPENAI_API_KEY), 없으면 Streamlit Secrets에서 같은 순서로 읽음
+    (HTTP 서비스·CLI처럼 Streamlit 밖에서 쓸 때는 환경변수 사용).
+    OPENAI_ENDPOINTS(여러 키·base_url 목록)가 있으면 요청을 나눠 보내는 EndpointPool 반환 (endpoint_pool.py 참고).
+    """
+    if api_key is None and os.environ.get("OPENAI_ENDPOINTS"):
+        return _pooled_client(os.environ["OPENAI_ENDPOINTS"])
+
+    from openai import OpenAI
+
+    api_key = api_key or os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        import streamlit as st
+
+        endpoints = st.secrets.get("OPENAI_ENDPOINTS")
+        if endpoints:
+            return _pooled_client(endpoints if isinstance(endpoints, str) else [dict(item) for item in endpoints])
+        api_key = st.secrets["OPENAI_API_KEY"]
     return OpenAI(api_key=api_key)
 
 def extract_text_from_pdf(pdf_path_or_bytes):
@@ -193,17 +241,153 @@ def extract_text_from_pdf(pdf_path_or_bytes):
     PDF에서 텍스트 추출.
     pdf_path_or_bytes: 파일 경로(str/Path) 또는 bytes (업로드 파일)
     """
+    return "".join(extract_pages_from_pdf(pdf_path_or_bytes)).strip()
+
+
+def extract_pages_from_pdf(pdf_path_or_bytes) -> list[str]:
+    """PDF 쪽별 텍스트 목록 (normalize_pdf_text로 쪽 위치 기준 반복 줄을 찾을 때 사용)."""
+    import fitz  # PyMuPDF
+
     if isinstance(pdf_path_or_bytes, (bytes, bytearray)):
         doc = fitz.open(stream=pdf_path_or_bytes, filetype="pdf")
     else:
         doc = fitz.open(pdf_path_or_bytes)
-    text = ""
     try:
-        for page in doc:
-            text += page.get_text("text")
+        return [page.get_text("text") for page in doc]
     finally:
         doc.close()
-    return text.strip()
+
+
+# -------------------------------------------------
+# 텍스트 경로 정리: 쪽마다 반복되는 머리말·꼬리말·쪽번호와 레이아웃 공백 제거
+# (10,000자 입력 창과 토큰을 본문에 쓰도록. 남기는 줄은 공백 외에는 그대로 둠)
+# -------------------------------------------------
+# 쪽 위·아래에서 머리말·꼬리말 후보로 보는 줄 수
+EDGE_LINES = 3
+# 전체 쪽 중 이 비율 이상(최소 2쪽)에 같은 위치로 나오면 반복 줄로 보고 제거
+REPEAT_MIN_RATIO = 0.5
+# "3", "- 3 -", "(3)", "3 / 12", "- 3/12 -" 같은 쪽번호 줄 (쪽의 맨 위·맨 아래 줄만 후보)
+_PAGE_NUMBER_RE = re.compile(r"^[-–—(\[]?\s*\d{1,4}\s*(?:/\s*\d{1,4})?\s*[-–—)\]]?$")
+_DIGITS_RE = re.compile(r"\d+")
+_LAYOUT_SPACE_RE = re.compile(r"[ \t 　]+")
+# 담당 부서·담당자 연락처 블록: 시작 줄부터 연락처가 든 마지막 줄(전화번호, 책임자·담당자)까지.
+# 전화번호가 하나는 있어야 블록으로 봄
+_CONTACT_START_RE = re.compile(r"^[<〈\[(]?\s*(?:담당\s*부서|보도\s*자료\s*문의|문의\s*처)")
+_CONTACT_LABEL_RE = re.compile(r"책임자|담당자")
+_PHONE_RE = re.compile(r"\d{2,4}\)?[-.\s]\d{3,4}[-.\s]\d{4}")
+CONTACT_LINE_MAX = 40
+CONTACT_BLOCK_MAX_LINES = 30
+
+
+def _edge_keys(lines: list[str], page_index: int, edge_lines: int) -> dict[int, list[tuple]]:
+    """
+    쪽 위·아래 edge_lines줄이 여러 쪽에서 같은 줄인지 비교할 키.
+    - 머리말·꼬리말: 글자 그대로 같은 줄만 (위치, 내용). "참고 1"·"붙임 2"처럼 번호만 다른 제목은 본문이므로 남김
+    - 쪽번호("3", "- 3 -", "3/12"): 맨 위·맨 아래 줄이고 번호가 쪽 순서를 따라 늘어날 때만 (위치, 번호 - 쪽 순서)
+    """
+    keys: dict[int, list[tuple]] = {}
+    for offset in range(min(edge_lines, len(lines))):
+        for side, i in (("top", offset), ("bottom", len(lines) - 1 - offset)):
+            if i in keys:
+                continue
+            line = lines[i]
+            if _PAGE_NUMBER_RE.match(line):
+                if offset == 0:
+                    keys[i] = [(side, "쪽번호", int(_DIGITS_RE.search(line).group()) - page_index)]
+                continue
+            keys[i] = [(side, offset, line)]
+    return keys
+
+
+def _strip_contact_blocks(lines: list[str]) -> tuple[list[str], int]:
+    """
+    담당 부서·담당자 연락처 블록을 지우고 (남은 줄, 지운 줄 수) 반환.
+    블록은 시작 줄부터 연락처(전화번호, 책임자·담당자)가 든 마지막 줄까지로, 뒤따르는 제목·부제는 남긴다.
+    전화번호가 없으면 그대로 둠.
+    """
+    kept, removed, i = [], 0, 0
+    while i < len(lines):
+        if len(lines[i]) <= CONTACT_LINE_MAX and _CONTACT_START_RE.match(lines[i]):
+            end, scan = i + 1, i + 1
+            while (
+                scan < len(lines) and scan - i < CONTACT_BLOCK_MAX_LINES
+                and len(lines[scan]) <= CONTACT_LINE_MAX and not lines[scan].startswith("붙임")
+            ):
+                if _PHONE_RE.search(lines[scan]) or _CONTACT_LABEL_RE.search(lines[scan]):
+                    end = scan + 1
+                scan += 1
+            if any(_PHONE_RE.search(line) for line in lines[i:end]):
+                removed += end - i
+                i = end
+                continue
+        kept.append(lines[i])
+        i += 1
+    return kept, removed
+
+
+def normalize_pdf_text(
+    pages: list[str] | str,
+    edge_lines: int = EDGE_LINES,
+    repeat_min_ratio: float = REPEAT_MIN_RATIO,
+) -> tuple[str, dict]:
+    """
+    추출 텍스트에서 레이아웃 잡음을 걷어내고 (정리된 텍스트, 통계) 반환.
+    - 여러 쪽의 같은 위치(위·아래 edge_lines줄)에 반복되는 머리말·꼬리말 제거
+    - 맨 위·맨 아래 줄의 쪽번호 제거 (번호가 쪽 순서를 따라 늘어나는 경우만. 표의 숫자 줄은 그대로)
+    - 전화번호가 든 담당 부서·담당자 연락처 블록 제거
+    - 줄 안의 연속 공백을 한 칸으로, 빈 줄은 지우고 쪽 사이만 빈 줄 하나로 구분
+    남는 줄의 글자는 공백 외에는 바꾸지 않는다 (하이픈 줄바꿈 등은 원문 표기일 수 있어 손대지 않음).
+    pages가 문자열이거나 한 쪽뿐이면 쪽 간 비교를 할 수 없으므로 연락처 블록과 공백만 정리.
+    통계: 원문 글자수, 정리 후 글자수, 절감 글자수, 제거한 반복 줄 수, 제거한 쪽번호 수, 제거한 연락처 줄 수
+    (원문 글자수도 쪽 사이를 빈 줄 하나로 이어 붙인 길이로 세어, 쪽 구분 때문에 절감이 음수가 되지 않음)
+    """
+    if isinstance(pages, str):
+        pages = [pages]
+    page_lines = [[line.strip() for line in page.splitlines()] for page in pages]
+    page_lines = [[line for line in lines if line] for lines in page_lines]
+
+    # 같은 키가 나온 쪽 수 (한 쪽에서는 한 번만 셈). 한 쪽뿐이면 비교하지 않음
+    if len(page_lines) > 1:
+        page_keys = [_edge_keys(lines, p, edge_lines) for p, lines in enumerate(page_lines)]
+    else:
+        page_keys = [{} for _ in page_lines]
+    counts: dict[tuple, int] = {}
+    for keys in page_keys:
+        for key in {k for line_keys in keys.values() for k in line_keys}:
+            counts[key] = counts.get(key, 0) + 1
+    min_pages = max(2, math.ceil(len(pages) * repeat_min_ratio))
+
+    kept_pages, repeated, page_numbers, contact_lines = [], 0, 0, 0
+    for lines, keys in zip(page_lines, page_keys):
+        kept = []
+        for i, line in enumerate(lines):
+            if any(counts[k] >= min_pages for k in keys.get(i, ())):
+                if _PAGE_NUMBER_RE.match(line):
+                    page_numbers += 1
+                else:
+                    repeated += 1
+                continue
+            kept.append(_LAYOUT_SPACE_RE.sub(" ", line))
+        kept, removed = _strip_contact_blocks(kept)
+        contact_lines += removed
+        if kept:
+            kept_pages.append("\n".join(kept))
+    text = "\n\n".join(kept_pages)
+
+    original_chars = sum(len(page) for page in pages) + 2 * (len(pages) - 1)
+    return text, {
+        "원문 글자수": original_chars,
+        "정리 후 글자수": len(text),
+        "절감 글자수": original_chars - len(text),
+        "제거한 반복 줄 수": repeated,
+        "제거한 쪽번호 수": page_numbers,
+        "제거한 연락처 줄 수": contact_lines,
+    }
+
+
+def extract_normalized_text(pdf_path_or_bytes) -> tuple[str, dict]:
+    """PDF 텍스트를 쪽별로 추출해 normalize_pdf_text로 정리."""
+    return normalize_pdf_text(extract_pages_from_pdf(pdf_path_or_bytes))
 
 
 def summarize_text_with_gpt(
@@ -212,11 +396,17 @@ def summarize_text_with_gpt(
     model: str = "gpt-4.1",
     max_chunk_size: int = 10000,
     prompt: str | None = None,
+    normalize: bool = True,
 ):
-    """텍스트 앞부분을 GPT로 요약."""
+    """
+    텍스트 앞부분을 GPT로 요약.
+    normalize=True면 앞부분을 자르기 전에 레이아웃 공백을 정리 (이미 normalize_pdf_text로 정리했으면 False).
+    """
     if not (text or "").strip():
         return "⚠️ 텍스트 없음 (스캔본 또는 추출 불가)"
 
+    if normalize:
+        text, _ = normalize_pdf_text(text)
     head_text = text[:max_chunk_size]
     if prompt is None:
         prompt = "다음 내용을 5줄 이내로 핵심만 요약해줘."
@@ -232,12 +422,17 @@ def summarize_text_with_gpt(
     return response.choices[0].message.content.strip()
 
 
-def admin_url_from_filename(pdf_filename: str, is_epts: bool = False) -> str:
-    """파일명에서 관리자 경로 생성."""
+def symbol_from_filename(pdf_filename: str) -> str:
+    """파일명에서 심볼 번호 추출 (앞쪽 영문 접두사 뒤의 숫자). 없으면 빈 문자열."""
     base = os.path.splitext(os.path.basename(pdf_filename))[0]
     base = re.sub(r"^[A-Za-z]+", "", base)
     m = re.match(r"(\d+)", base)
-    n_str = m.group(1) if m else ""
+    return m.group(1) if m else ""
+
+
+def admin_url_from_filename(pdf_filename: str, is_epts: bool = False) -> str:
+    """파일명에서 관리자 경로 생성."""
+    n_str = symbol_from_filename(pdf_filename)
     if not n_str:
         return ""
     if is_epts:
@@ -248,58 +443,311 @@ def admin_url_from_filename(pdf_filename: str, is_epts: bool = False) -> str:
     )
 
 
+EPIC_SYSTEM_TEXT = "당신은 정부·경제 정책 보고서를 공식 문체로 요약하는 분석가입니다."
+
+
+def epic_request_texts(prompt: str | None = None) -> tuple[str, str]:
+    """EPIC 보도자료 요청의 (시스템 메시지, 사용자 지시문)."""
+    return EPIC_SYSTEM_TEXT, prompt or DEFAULT_PROMPT
+
+
+def epts_request_texts(title: str) -> tuple[str, str]:
+    """EPTS 대책자료 요청의 (시스템 메시지, 사용자 지시문)."""
+    return SYSTEM_RULES_EPTS, f"제목: {title}\n\n아래 파일을 참고하여 정책배경/주요내용을 작성하세요."
+
+
+def generation_settings_key(mode: str, model: str, cascade: bool = False, prompt: str | None = None) -> str:
+    """
+    초록을 만든 설정 키 (모델 또는 캐스케이드 구성 + 지시문 해시). 검색 인덱스 재사용 판단용:
+    DEFAULT_PROMPT·규칙을 고치거나 모델을 바꾸면 키가 달라져 이전 초록을 재사용하지 않음.
+    """
+    if mode == "epts":
+        system_text, user_text = epts_request_texts("{제목}")
+    else:
+        system_text, user_text = epic_request_texts(prompt)
+    models = "캐스케이드:" + ">".join(CASCADE_MODELS) if cascade else model
+    prompt_hash = hashlib.sha256(f"{system_text}\n\n{user_text}".encode("utf-8")).hexdigest()[:16]
+    return f"{models}|{prompt_hash}"
+
+
+def upload_pdf_file(client: OpenAI, pdf_bytes: bytes, pdf_filename: str) -> str:
+    """PDF 원본을 OpenAI 파일로 업로드하고 file_id 반환."""
+    # 파일명이 .pdf로 끝나지 않으면 확장자 추가
+    if not pdf_filename.lower().endswith('.pdf'):
+        pdf_filename = pdf_filename + '.pdf'
+
+    uploaded = client.files.create(
+        file=(pdf_filename, io.BytesIO(pdf_bytes)),
+        purpose="assistants",
+    )
+    return uploaded.id
+
+
+def delete_uploaded_file(client: OpenAI, file_id: str) -> None:
+    """업로드한 파일 정리 (실패하더라도 무시)."""
+    try:
+        client.files.delete(file_id)
+    except Exception:
+        pass
+
+
+def request_abstract(
+    client: OpenAI,
+    file_id: str,
+    system_text: str,
+    user_text: str,
+    model: str = "gpt-4.1",
+    timeout: float = 180,
+):
+    """업로드된 PDF(file_id)로 Responses API 호출. 응답 객체 그대로 반환 (usage 확인용)."""
+    return client.responses.create(
+        model=model,
+        input=[
+            {
+                "role": "system",
+                "content": [{"type": "input_text", "text": system_text}],
+            },
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "input_text",
+                        "text": user_text,
+                    },
+                    {
+                        "type": "input_file",
+                        "file_id": file_id,
+                    },
+                ],
+            },
+        ],
+        timeout=timeout,
+    )
+
+
+# -------------------------------------------------
+# 지연 대응: 모델·문서 크기별 p95 추적, 헤지(중복) 요청, 적응형 timeout
+# -------------------------------------------------
+DEFAULT_TIMEOUT = 180
+MIN_TIMEOUT = 60
+# p95의 몇 배까지 기다릴지 (적응형 timeout)
+TIMEOUT_P95_FACTOR = 3.0
+# 문서 크기 구간 경계 (bytes)
+SIZE_BUCKETS = (500_000, 2_000_000, 8_000_000)
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class LatencyTracker:
+    """
+    모델·문서 크기 구간별 최근 생성 소요시간으로 p95를 추정하고 헤지 지표를 모은다.
+    - hedge_after: 이 시간이 지나도 응답이 없으면 중복 요청 (표본이 부족하면 None → 헤지 안 함)
+    - timeout_for: 문서별 timeout = p95 × TIMEOUT_P95_FACTOR (MIN_TIMEOUT~DEFAULT_TIMEOUT로 제한)
+    """
+
+    def __init__(self, window: int = 50, min_samples: int = 5):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: dict[tuple[str, int], list[float]] = {}
+        self._events: list[dict] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def size_bucket(size_bytes: int) -> int:
+        return sum(size_bytes >= edge for edge in SIZE_BUCKETS)
+
+    def record(self, model: str, size_bytes: int, seconds: float) -> None:
+        key = (model, self.size_bucket(size_bytes))
+        with self._lock:
+            samples = self._samples.setdefault(key, [])
+            samples.append(seconds)
+            del samples[:-self.window]
+
+    def p95(self, model: str, size_bytes: int) -> float | None:
+        with self._lock:
+            samples = list(self._samples.get((model, self.size_bucket(size_bytes)), ()))
+        if len(samples) < self.min_samples:
+            return None
+        return _percentile(samples, 0.95)
+
+    def median(self, model: str) -> float | None:
+        """model의 최근 소요시간 중앙값 (크기 구간 전체, 표본이 min_samples 미만이면 None)."""
+        with self._lock:
+            samples = [s for (m, _), values in self._samples.items() if m == model for s in values]
+        if len(samples) < self.min_samples:
+            return None
+        return _percentile(samples, 0.5)
+
+    def hedge_after(self, model: str, size_bytes: int) -> float | None:
+        return self.p95(model, size_bytes)
+
+    def timeout_for(self, model: str, size_bytes: int) -> float:
+        p95 = self.p95(model, size_bytes)
+        if p95 is None:
+            return DEFAULT_TIMEOUT
+        return min(DEFAULT_TIMEOUT, max(MIN_TIMEOUT, p95 * TIMEOUT_P95_FACTOR))
+
+    def add_event(self, event: dict) -> None:
+        with self._lock:
+            self._events.append(event)
+
+    def metrics(self, since: float = 0.0) -> dict:
+        """
+        since 이후 호출의 헤지 지표.
+        - 원 요청 p95: 첫 요청만 기다렸다면 걸렸을 시간 (끝나지 않았으면 timeout까지)
+        - 실제 p95: 헤지 포함 실제로 결과를 받은 시간
+        """
+        with self._lock:
+            events = [e for e in self._events if e["시작"] >= since]
+        hedged = [e for e in events if e["헤지"]]
+        actual = [e["실제 소요시간"] for e in events]
+        primary = [e["원 요청 소요시간"] for e in events if e["원 요청 소요시간"] is not None]
+        actual_p95 = _percentile(actual, 0.95)
+        primary_p95 = _percentile(primary, 0.95)
+        return {
+            "호출 수": len(events),
+            "헤지 수": len(hedged),
+            "헤지 비율": (len(hedged) / len(events)) if events else 0.0,
+            "헤지 승리 수": sum(1 for e in hedged if e["헤지 승리"]),
+            "실제 p95(초)": actual_p95,
+            "원 요청 p95(초)": primary_p95,
+            "p95 개선(초)": (primary_p95 - actual_p95) if actual_p95 is not None and primary_p95 is not None else None,
+        }
+
+
+# 프로세스 전체에서 공유하는 기본 추적기 (앱·워커가 같은 통계를 사용)
+DEFAULT_LATENCY_TRACKER = LatencyTracker()
+_hedge_executor: ThreadPoolExecutor | None = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+        return _hedge_executor
+
+
+def request_abstract_hedged(
+    client: OpenAI,
+    file_id: str,
+    system_text: str,
+    user_text: str,
+    model: str = "gpt-4.1",
+    size_bytes: int = 0,
+    tracker: LatencyTracker | None = None,
+):
+    """
+    request_abstract에 지연 대응을 더한 버전.
+    - timeout은 tracker의 p95 기반 (표본이 없으면 DEFAULT_TIMEOUT)
+    - p95가 지나도 응답이 없으면 같은 요청을 한 번 더 보내 먼저 끝난 쪽을 사용
+    - 진 쪽은 결과를 버림 (동기 HTTP 호출은 중간에 끊을 수 없으므로 timeout으로 종료됨)
+    """
+    tracker = tracker or DEFAULT_LATENCY_TRACKER
+    timeout = tracker.timeout_for(model, size_bytes)
+    hedge_after = tracker.hedge_after(model, size_bytes)
+    executor = _get_hedge_executor()
+    started_wall = time.time()
+    started = time.perf_counter()
+    event = {"시작": started_wall, "모델": model, "헤지": False, "헤지 승리": False,
+             "실제 소요시간": None, "원 요청 소요시간": None}
+
+    def call():
+        return request_abstract(client, file_id, system_text, user_text, model=model, timeout=timeout)
+
+    def on_primary_done(f: Future):
+        # 원 요청만 기다렸을 때의 소요시간 (실패하면 timeout까지 기다린 것으로 봄)
+        # 지연 분포에는 헤지 승패와 관계없이 원 요청의 실제 소요시간을 기록 (timeout이면 timeout으로)
+        # — 이긴 쪽만 기록하면 느린 꼬리가 빠져 p95가 계속 낮아짐
+        if f.cancelled():
+            return
+        elapsed = time.perf_counter() - started
+        exc = f.exception()
+        event["원 요청 소요시간"] = elapsed if exc is None else timeout
+        if exc is None:
+            tracker.record(model, size_bytes, elapsed)
+        elif isinstance(exc, TimeoutError) or type(exc).__name__ == "APITimeoutError":
+            tracker.record(model, size_bytes, timeout)
+
+    primary = executor.submit(call)
+    primary.add_done_callback(on_primary_done)
+    futures = [primary]
+    try:
+        if hedge_after is not None:
+            done, _ = wait(futures, timeout=hedge_after)
+            if not done:
+                event["헤지"] = True
+                futures.append(executor.submit(call))
+
+        deadline = started + timeout
+        pending = list(futures)
+        last_error = None
+        while pending:
+            done, _ = wait(pending, timeout=max(0.0, deadline - time.perf_counter()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for f in done:
+                pending.remove(f)
+                if f.exception() is None:
+                    event["헤지 승리"] = f is not primary
+                    elapsed = time.perf_counter() - started
+                    event["실제 소요시간"] = elapsed
+                    for other in pending:
+                        other.cancel()
+                    return f.result()
+                last_error = f.exception()
+        if last_error is not None:
+            raise last_error
+        raise TimeoutError(f"생성 시간 초과 ({timeout:.0f}초)")
+    finally:
+        if event["실제 소요시간"] is None:
+            event["실제 소요시간"] = time.perf_counter() - started
+        if event["원 요청 소요시간"] is None and not primary.done():
+            event["원 요청 소요시간"] = timeout
+        tracker.add_event(event)
+
+
 def generate_epic_abstract_from_pdf_bytes(
     client: OpenAI,
     pdf_bytes: bytes,
     pdf_filename: str,
     prompt: str | None = None,
     model: str = "gpt-4.1",
+    latency_tracker: LatencyTracker | None = None,
 ) -> str:
     """
     EPIC 정부 보도자료용: PDF 원본 파일을 OpenAI 파일로 업로드 후 DEFAULT_PROMPT에 따라 초록 생성.
+    latency_tracker를 주면 고정 timeout 대신 p95 기반 timeout + 헤지 요청 사용.
     """
-    prompt = prompt or DEFAULT_PROMPT
-    # 파일명이 .pdf로 끝나지 않으면 확장자 추가
-    if not pdf_filename.lower().endswith('.pdf'):
-        pdf_filename = pdf_filename + '.pdf'
-    
-    uploaded = client.files.create(
-        file=(pdf_filename, io.BytesIO(pdf_bytes)),
-        purpose="assistants",
-    )
+    system_text, user_text = epic_request_texts(prompt)
+    file_id = upload_pdf_file(client, pdf_bytes, pdf_filename)
     try:
-        resp = client.responses.create(
-            model=model,
-            input=[
-                {
-                    "role": "system",
-                    "content": [{"type": "input_text", "text": "당신은 정부·경제 정책 보고서를 공식 문체로 요약하는 분석가입니다."}],
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "input_text",
-                            "text": prompt,
-                        },
-                        {
-                            "type": "input_file",
-                            "file_id": uploaded.id,
-                        },
-                    ],
-                },
-            ],
-            timeout=180,
-        )
+        if latency_tracker is not None:
+            resp = request_abstract_hedged(
+                client, file_id, system_text, user_text, model=model,
+                size_bytes=len(pdf_bytes), tracker=latency_tracker,
+            )
+        else:
+            resp = request_abstract(client, file_id, system_text, user_text, model=model)
         return resp.output_text
     finally:
-        try:
-            client.files.delete(uploaded.id)
-        except Exception:
-            pass
+        delete_uploaded_file(client, file_id)
 
 
-def process_one_pdf(client, pdf_name: str, pdf_content: bytes, prompt: str | None = None, model: str = "gpt-4.1"):
+def process_one_pdf(
+    client,
+    pdf_name: str,
+    pdf_content: bytes,
+    prompt: str | None = None,
+    model: str = "gpt-4.1",
+    latency_tracker: LatencyTracker | None = None,
+):
     """
     EPIC 정부 보도자료용 PDF 하나 처리:
     - (선택) 텍스트 미리보기
@@ -309,18 +757,21 @@ def process_one_pdf(client, pdf_name: str, pdf_content: bytes, prompt: str | Non
     try:
         # 미리보기용 텍스트 (있으면 좋고, 없어도 기능에는 영향 없음)
         try:
-            text = extract_text_from_pdf(pdf_content)
+            with profile_stage("추출"):
+                text = extract_text_from_pdf(pdf_content)
             text_preview = (text[:3000] + "...") if len(text) > 3000 else text
         except Exception:
             text_preview = ""
 
-        summary = generate_epic_abstract_from_pdf_bytes(
-            client=client,
-            pdf_bytes=pdf_content,
-            pdf_filename=pdf_name,
-            prompt=prompt,
-            model=model,
-        )
+        with profile_stage("업로드+생성"):
+            summary = generate_epic_abstract_from_pdf_bytes(
+                client=client,
+                pdf_bytes=pdf_content,
+                pdf_filename=pdf_name,
+                prompt=prompt,
+                model=model,
+                latency_tracker=latency_tracker,
+            )
         admin_url = admin_url_from_filename(pdf_name, is_epts=False)
         return {
             "파일명": pdf_name,
@@ -352,9 +803,10 @@ def process_pdfs_from_folder(client, folder_path: str, prompt: str | None = None
         if f.suffix.lower() != ".pdf":
             continue
         try:
-            text = extract_text_from_pdf(str(f))
+            # 반복 머리말·쪽번호를 걷어내 10,000자 창에 본문이 더 들어가도록
+            text, norm_stats = extract_normalized_text(str(f))
             text_preview = (text[:3000] + "...") if len(text) > 3000 else text
-            summary = summarize_text_with_gpt(client, text, model=model, prompt=prompt)
+            summary = summarize_text_with_gpt(client, text, model=model, prompt=prompt, normalize=False)
             admin_url = admin_url_from_filename(f.name)
             results.append({
                 "파일명": f.name,
@@ -362,6 +814,7 @@ def process_pdfs_from_folder(client, folder_path: str, prompt: str | None = None
                 "요약 결과": summary,
                 "관리자 경로": admin_url,
                 "오류": None,
+                "절감 글자수": norm_stats["절감 글자수"],
             })
         except Exception as e:
             results.append({
@@ -380,51 +833,28 @@ def generate_policy_abstract_from_pdf_bytes(
     pdf_filename: str,
     title: str,
     model: str = "gpt-4.1",
+    latency_tracker: LatencyTracker | None = None,
 ) -> str:
     """
     EPTS 대책자료용: PDF 원본 파일을 OpenAI 파일로 업로드 후 SYSTEM_RULES_EPTS에 따라 초록 생성.
     (main_notebook_EPTS_rev_0210.ipynb의 generate_file_abstract를 참고)
+    latency_tracker를 주면 고정 timeout 대신 p95 기반 timeout + 헤지 요청 사용.
     """
-    # 파일명이 .pdf로 끝나지 않으면 확장자 추가
-    if not pdf_filename.lower().endswith('.pdf'):
-        pdf_filename = pdf_filename + '.pdf'
-    
-    uploaded = client.files.create(
-        file=(pdf_filename, io.BytesIO(pdf_bytes)),
-        purpose="assistants",
-    )
+    system_text, user_text = epts_request_texts(title)
+    file_id = upload_pdf_file(client, pdf_bytes, pdf_filename)
     try:
-        resp = client.responses.create(
-            model=model,
-            input=[
-                {
-                    "role": "system",
-                    "content":[{"type": "input_text", "text": SYSTEM_RULES_EPTS}],
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "input_text",
-                            "text": f"제목: {title}\n\n아래 파일을 참고하여 정책배경/주요내용을 작성하세요.",
-                        },
-                        {
-                            "type": "input_file",
-                            "file_id": uploaded.id,
-                        },
-                    ],
-                },
-            ],
-            timeout=180,
-        )
+        if latency_tracker is not None:
+            resp = request_abstract_hedged(
+                client, file_id, system_text, user_text, model=model,
+                size_bytes=len(pdf_bytes), tracker=latency_tracker,
+            )
+        else:
+            resp = request_abstract(client, file_id, system_text, user_text, model=model)
         # openai-python 최신 버전에서 제공하는 편의 프로퍼티
         return resp.output_text
     finally:
         # 불필요한 파일은 정리 (실패하더라도 무시)
-        try:
-            client.files.delete(uploaded.id)
-        except Exception:
-            pass
+        delete_uploaded_file(client, file_id)
 
 
 def process_one_pdf_epts(
@@ -432,6 +862,7 @@ def process_one_pdf_epts(
     pdf_name: str,
     pdf_content: bytes,
     model: str = "gpt-4.1",
+    latency_tracker: LatencyTracker | None = None,
 ):
     """
     EPTS 대책자료용 PDF 하나 처리:
@@ -441,19 +872,22 @@ def process_one_pdf_epts(
     try:
         # 미리보기용 텍스트 (있으면 좋고, 없어도 기능에는 영향 없음)
         try:
-            text = extract_text_from_pdf(pdf_content)
+            with profile_stage("추출"):
+                text = extract_text_from_pdf(pdf_content)
             text_preview = (text[:3000] + "...") if len(text) > 3000 else text
         except Exception:
             text_preview = ""
 
         title = os.path.splitext(os.path.basename(pdf_name))[0]
-        summary = generate_policy_abstract_from_pdf_bytes(
-            client=client,
-            pdf_bytes=pdf_content,
-            pdf_filename=pdf_name,
-            title=title,
-            model=model,
-        )
+        with profile_stage("업로드+생성"):
+            summary = generate_policy_abstract_from_pdf_bytes(
+                client=client,
+                pdf_bytes=pdf_content,
+                pdf_filename=pdf_name,
+                title=title,
+                model=model,
+                latency_tracker=latency_tracker,
+            )
         admin_url = admin_url_from_filename(pdf_name, is_epts=True)
         return {
             "파일명": pdf_name,
@@ -472,10 +906,903 @@ def process_one_pdf_epts(
         }
 
 
+# -------------------------------------------------
+# 캐스케이드 모드: 저가 모델 우선, 구조 검증 실패 시 상위 모델로 재시도
+# -------------------------------------------------
+# 빠르고 저렴한 모델부터 순서대로 시도
+CASCADE_MODELS = ("gpt-4o-mini", "gpt-4.1")
+# 절감액 비교 기준 (항상 이 모델로 처리했을 때)
+BASELINE_MODEL = "gpt-4.1"
+# 모델별 단가 (USD / 1M 토큰, (입력, 출력))
+MODEL_PRICING = {
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """토큰 수로 예상 비용(USD) 계산. 단가를 모르는 모델은 0."""
+    price_in, price_out = MODEL_PRICING.get(model, (0.0, 0.0))
+    return (input_tokens * price_in + output_tokens * price_out) / 1_000_000
+
+
+def _usage_tokens(resp) -> tuple[int, int]:
+    """Responses API 응답에서 (입력 토큰, 출력 토큰) 추출."""
+    usage = getattr(resp, "usage", None)
+    if usage is None:
+        return 0, 0
+    return int(getattr(usage, "input_tokens", 0) or 0), int(getattr(usage, "output_tokens", 0) or 0)
+
+
+def _split_paragraphs(summary: str) -> list[str]:
+    return [p.strip() for p in re.split(r"\n\s*\n", (summary or "").strip()) if p.strip()]
+
+
+def validate_epic_abstract(summary: str) -> list[str]:
+    """
+    EPIC 초록 구조 검사 (DEFAULT_PROMPT 기준). 위반 사항 목록 반환, 빈 목록이면 통과.
+    - 문단 수: 개요 1 + 본문 2~5 + 마무리 1 + (조건부) 참고 1
+    - 개요: 한 문장, "A(부처)는 ’YY.M.DD. ..." 형식
+    """
+    paragraphs = _split_paragraphs(summary)
+    if not paragraphs:
+        return ["초록 없음"]
+
+    problems = []
+    if not 4 <= len(paragraphs) <= 8:
+        problems.append(f"문단 수 {len(paragraphs)}개 (허용 4~8개)")
+
+    overview = paragraphs[0]
+    # 한글 뒤 마침표 + 공백/끝 = 문장 끝 (날짜의 "."은 숫자 뒤라 제외됨)
+    if len(re.findall(r"[가-힣]\.(?=\s|$)", overview)) != 1 or not overview.endswith("."):
+        problems.append("개요 문단이 한 문장이 아님")
+    # 부처명은 "관계부처 합동은", "기획재정부와 환경부는"처럼 여러 단어일 수 있음 (최대 4단어)
+    if not re.match(r"^(?:[^\s,.]+\s){0,3}[^\s,.]+?[은는]\s", overview):
+        problems.append("개요 문단에 부처(A는) 없음")
+    if not re.search(r"[’‘']\d{2}\.\s?\d{1,2}\.\s?\d{1,2}\.", overview):
+        problems.append("개요 문단에 ’YY.M.DD. 형식 날짜 없음")
+
+    for p in paragraphs[1:]:
+        if p.startswith("<"):
+            break
+        if not p.startswith("-"):
+            problems.append("본문/마무리 문단 앞에 '-' 없음")
+            break
+    return problems
+
+
+def validate_epts_abstract(summary: str) -> list[str]:
+    """EPTS 초록 구조 검사 (SYSTEM_RULES_EPTS 최종 출력 구조 기준)."""
+    text = (summary or "").strip()
+    if not text:
+        return ["초록 없음"]
+
+    problems = []
+    for section in ("정책 관련 정보", "정책배경", "정책 내용"):
+        if section not in text:
+            problems.append(f"'{section}' 항목 없음")
+    m = re.search(r"관련부처\s*[:：]?\s*(.*)", text)
+    if not m or not m.group(1).strip():
+        problems.append("관련부처 없음")
+    m = re.search(r"발행일자\s*[:：]?\s*(.*)", text)
+    if not m or not re.search(r"\d", m.group(1)):
+        problems.append("발행일자 없음")
+    if "?" in text.replace("(?)", ""):
+        problems.append("'?' 깨짐 문자 포함")
+    return problems
+
+
+def generate_with_cascade(
+    client: OpenAI,
+    file_id: str,
+    system_text: str,
+    user_text: str,
+    validate,
+    models: tuple[str, ...] = CASCADE_MODELS,
+    attempts: list | None = None,
+    latency_tracker: LatencyTracker | None = None,
+    size_bytes: int = 0,
+) -> tuple[str, list[str]]:
+    """
+    업로드된 파일(file_id)로 models 순서대로 생성 → validate 검사.
+    통과하면 중단하고 (초록, 위반 목록) 반환. 시도별 모델·소요시간·토큰·비용은 attempts에 누적.
+    상위 모델 호출이 실패하면(429, timeout 등) 실패는 attempts에 남기고 마지막으로 받은 초록과 그 위반 목록을 반환.
+    어떤 모델도 초록을 돌려주지 못했을 때만 마지막 예외를 다시 발생시킨다.
+    latency_tracker를 주면 각 시도에 p95 기반 timeout + 헤지 요청 사용.
+    """
+    if attempts is None:
+        attempts = []
+    summary, problems, last_error, produced = "", [], None, False
+    for model in models:
+        started = time.perf_counter()
+        try:
+            if latency_tracker is not None:
+                resp = request_abstract_hedged(
+                    client, file_id, system_text, user_text, model=model,
+                    size_bytes=size_bytes, tracker=latency_tracker,
+                )
+            else:
+                resp = request_abstract(client, file_id, system_text, user_text, model=model)
+                # 헤지를 쓰지 않아도 모델별 소요시간은 남김 (summarize_cascade_batch의 절감 시간 추정용)
+                DEFAULT_LATENCY_TRACKER.record(model, size_bytes, time.perf_counter() - started)
+        except Exception as e:
+            # 하위 모델 호출 실패도 검증 실패와 같이 다음 모델로 넘김
+            last_error = e
+            attempts.append({
+                "모델": model,
+                "소요시간": time.perf_counter() - started,
+                "입력 토큰": 0,
+                "출력 토큰": 0,
+                "비용": 0.0,
+                "검증 오류": [f"호출 실패: {e}"],
+                "호출 실패": True,
+            })
+            continue
+        input_tokens, output_tokens = _usage_tokens(resp)
+        summary = resp.output_text
+        problems = validate(summary)
+        attempts.append({
+            "모델": model,
+            "소요시간": time.perf_counter() - started,
+            "입력 토큰": input_tokens,
+            "출력 토큰": output_tokens,
+            "비용": estimate_cost(model, input_tokens, output_tokens),
+            "검증 오류": problems,
+        })
+        produced = True
+        if not problems:
+            break
+    if not produced:
+        raise last_error
+    return summary, problems
+
+
+def cascade_used_model(attempts: list) -> str:
+    """시도 내역에서 결과로 쓴 초록을 만든 모델 (호출이 실패한 시도는 건너뜀)."""
+    for attempt in reversed(attempts):
+        if not attempt.get("호출 실패"):
+            return attempt["모델"]
+    return ""
+
+
+def process_one_pdf_cascade(
+    client: OpenAI,
+    pdf_name: str,
+    pdf_content: bytes,
+    is_epts: bool = False,
+    prompt: str | None = None,
+    models: tuple[str, ...] = CASCADE_MODELS,
+):
+    """
+    캐스케이드 방식으로 PDF 하나 처리:
+    - 파일은 한 번만 업로드하고, models 순서대로 생성 → 구조 검증
+    - 검증을 통과하면 중단, 실패한 문서만 다음(상위) 모델로 재시도
+    결과 dict는 process_one_pdf와 같은 키에 "사용 모델", "검증 오류", "시도 내역"을 추가.
+    """
+    validate = validate_epts_abstract if is_epts else validate_epic_abstract
+    attempts = []
+    try:
+        try:
+            with profile_stage("추출"):
+                text = extract_text_from_pdf(pdf_content)
+            text_preview = (text[:3000] + "...") if len(text) > 3000 else text
+        except Exception:
+            text_preview = ""
+
+        if is_epts:
+            title = os.path.splitext(os.path.basename(pdf_name))[0]
+            system_text, user_text = epts_request_texts(title)
+        else:
+            system_text, user_text = epic_request_texts(prompt)
+
+        file_id = upload_pdf_file(client, pdf_content, pdf_name)
+        try:
+            summary, problems = generate_with_cascade(
+                client, file_id, system_text, user_text, validate, models=models, attempts=attempts
+            )
+        finally:
+            delete_uploaded_file(client, file_id)
+
+        admin_url = admin_url_from_filename(pdf_name, is_epts=is_epts)
+        return {
+            "파일명": pdf_name,
+            "텍스트파싱 결과": text_preview,
+            "요약 결과": summary,
+            "관리자 경로": admin_url,
+            "오류": None,
+            "사용 모델": cascade_used_model(attempts),
+            "검증 오류": problems,
+            "시도 내역": attempts,
+        }
+    except Exception as e:
+        return {
+            "파일명": pdf_name,
+            "텍스트파싱 결과": "",
+            "요약 결과": "",
+            "관리자 경로": "",
+            "오류": str(e),
+            "사용 모델": attempts[-1]["모델"] if attempts else "",
+            "검증 오류": [],
+            "시도 내역": attempts,
+        }
+
+
+# 관측치가 전혀 없을 때 쓰는 (baseline 소요시간 / 하위 모델 소요시간) 기본 비율 (gpt-4.1 / gpt-4o-mini 대략값)
+DEFAULT_BASELINE_LATENCY_RATIO = 2.0
+
+
+def summarize_cascade_batch(
+    results: list[dict],
+    baseline_model: str = BASELINE_MODEL,
+    latency_tracker: LatencyTracker | None = None,
+) -> dict:
+    """
+    캐스케이드 배치 리포트: 에스컬레이션 비율, 항상 baseline_model을 썼을 때 대비 절감 비용·시간.
+    - 기준 비용: baseline_model 시도가 있으면 그 값, 없으면 첫 시도 토큰 수를 baseline 단가로 환산
+    - 기준 시간: baseline_model 시도가 있으면 그 값, 없으면 (baseline 소요시간 / 첫 시도 소요시간) 비율로 추정.
+      비율은 이번 배치의 에스컬레이션 문서 → latency_tracker(기본 DEFAULT_LATENCY_TRACKER)의 모델별 중앙값
+      → DEFAULT_BASELINE_LATENCY_RATIO 순으로 사용하고, 어느 것을 썼는지 "절감 시간 근거"에 남김
+    """
+    latency_tracker = latency_tracker or DEFAULT_LATENCY_TRACKER
+    rows = [r for r in results if r.get("시도 내역")]
+    escalated = [r for r in rows if len(r["시도 내역"]) > 1]
+
+    ratios = []
+    for r in escalated:
+        first = r["시도 내역"][0]
+        # 호출이 실패한 시도의 소요시간은 생성 시간이 아니므로 비율에서 뺌
+        base = next((a for a in r["시도 내역"] if a["모델"] == baseline_model and not a.get("호출 실패")), None)
+        if base is not None and first["모델"] != baseline_model and first["입력 토큰"] and first["소요시간"] > 0:
+            ratios.append(base["소요시간"] / first["소요시간"])
+    latency_ratios: dict[str, float] = {}
+    if ratios:
+        latency_basis = "배치 관측"
+    else:
+        # 에스컬레이션이 없으면 (최선의 경우) 추적기에 쌓인 모델별 소요시간으로 비율 추정
+        latency_basis = "지연 추적기"
+        baseline_median = latency_tracker.median(baseline_model)
+        for model in {r["시도 내역"][0]["모델"] for r in rows} - {baseline_model}:
+            model_median = latency_tracker.median(model)
+            if baseline_median is None or not model_median:
+                latency_basis = "기본 비율"
+                break
+            latency_ratios[model] = baseline_median / model_median
+        if latency_basis == "기본 비율":
+            latency_ratios = {}
+
+    def latency_ratio(model: str) -> float:
+        if ratios:
+            return sum(ratios) / len(ratios)
+        return latency_ratios.get(model, DEFAULT_BASELINE_LATENCY_RATIO)
+
+    actual_cost = baseline_cost = actual_time = baseline_time = 0.0
+    for r in rows:
+        attempts = r["시도 내역"]
+        first = attempts[0]
+        base = next((a for a in attempts if a["모델"] == baseline_model), None)
+        actual_cost += sum(a["비용"] for a in attempts)
+        actual_time += sum(a["소요시간"] for a in attempts)
+        if base is not None and base["입력 토큰"]:
+            baseline_cost += base["비용"]
+        else:
+            baseline_cost += estimate_cost(baseline_model, first["입력 토큰"], first["출력 토큰"])
+        if base is not None:
+            baseline_time += base["소요시간"]
+        else:
+            baseline_time += first["소요시간"] * latency_ratio(first["모델"])
+
+    return {
+        "문서 수": len(rows),
+        "에스컬레이션 수": len(escalated),
+        "에스컬레이션 비율": (len(escalated) / len(rows)) if rows else 0.0,
+        "실제 비용(USD)": actual_cost,
+        "기준 비용(USD)": baseline_cost,
+        "절감 비용(USD)": baseline_cost - actual_cost,
+        "실제 소요시간(초)": actual_time,
+        "기준 소요시간(초)": baseline_time,
+        "절감 시간(초)": baseline_time - actual_time,
+        "절감 시간 근거": latency_basis,
+    }
+
+
+# -------------------------------------------------
+# 단계별 파이프라인: 추출(CPU) / 업로드(네트워크) / 생성(대기) / 삭제를 각자의 큐로 분리
+# -------------------------------------------------
+# 파이프라인 업로드·생성 단계 기본 워커 수 (ETA 추정에도 사용)
+PIPELINE_WORKERS = 4
+
+
+def upload_key(pdf_name: str, pdf_bytes: bytes, digest: str | None = None) -> str:
+    """업로드 재사용 판단용 키 (파일명 + 내용 해시). digest(SHA-256 hex)를 이미 알면 넘겨 재계산 생략."""
+    return f"{pdf_name}:{digest or hashlib.sha256(pdf_bytes).hexdigest()}"
+
+
+# 이 시간 동안 다시 prefetch되지 않은(= 그 세션의 rerun이 없는) 미사용 업로드는 정리
+# (탭을 닫거나 새로고침해 세션이 끝났거나, 실행 버튼을 누르지 않고 떠난 경우)
+SPECULATIVE_TTL = 15 * 60
+SPECULATIVE_SWEEP_INTERVAL = 60
+_live_uploaders: "weakref.WeakSet[SpeculativeUploader]" = weakref.WeakSet()
+
+
+class SpeculativeUploader:
+    """
+    실행 버튼을 누르기 전에 PDF를 미리 업로드해 두는 백그라운드 업로더.
+    - prefetch: st.file_uploader에 파일이 올라오는 즉시 호출 (같은 키는 한 번만 업로드, 호출할 때마다 사용 시각 갱신)
+    - take: 파이프라인이 업로드 결과(Future)를 넘겨받음. 이후 파일 삭제 책임은 호출자에게 있음
+      (넘겨준 키는 기억해 두고, 같은 파일로 다시 prefetch해도 재업로드하지 않음)
+    - discard_except: 업로드 목록에서 빠진 파일의 미사용 업로드 정리
+    - ttl초 동안 prefetch되지 않은 미사용 업로드는 백그라운드에서 정리하고, 남은 업로드가 없으면 스레드도 종료
+      (세션이 끝나도 close가 불리지 않으므로). 프로세스 종료 시에도 남은 업로드 정리
+    """
+
+    def __init__(self, client: OpenAI, max_workers: int = 4, ttl: float = SPECULATIVE_TTL):
+        self.client = client
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self._executor: ThreadPoolExecutor | None = None
+        self._sweeper: threading.Thread | None = None
+        self._futures: dict[str, Future] = {}
+        self._touched: dict[str, float] = {}
+        self._taken: set[str] = set()
+        self._lock = threading.Lock()
+        _live_uploaders.add(self)
+
+    def prefetch(self, pdf_name: str, pdf_bytes: bytes, key: str | None = None) -> str:
+        """key(upload_key 결과)를 이미 알고 있으면 넘겨 해시 재계산을 생략."""
+        key = key or upload_key(pdf_name, pdf_bytes)
+        with self._lock:
+            if key not in self._futures and key not in self._taken:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="prefetch")
+                self._futures[key] = self._executor.submit(upload_pdf_file, self.client, pdf_bytes, pdf_name)
+                if self._sweeper is None:
+                    self._sweeper = threading.Thread(target=self._sweep_loop, name="prefetch-sweeper", daemon=True)
+                    self._sweeper.start()
+            if key in self._futures:
+                self._touched[key] = time.monotonic()
+        return key
+
+    def take(self, pdf_name: str, pdf_bytes: bytes, key: str | None = None) -> Future | None:
+        key = key or upload_key(pdf_name, pdf_bytes)
+        with self._lock:
+            self._taken.add(key)
+            self._touched.pop(key, None)
+            return self._futures.pop(key, None)
+
+    def drop(self, pdf_name: str, pdf_bytes: bytes, key: str | None = None) -> None:
+        """쓰지 않을 파일(예: 이전 결과 재사용)의 업로드 정리. 이후 prefetch해도 재업로드하지 않음."""
+        future = self.take(pdf_name, pdf_bytes, key=key)
+        if future is not None:
+            self._discard(future)
+
+    def _discard(self, future: Future) -> None:
+        # 업로드가 아직 진행 중이면 끝난 뒤 삭제
+        def _cleanup(f: Future):
+            if not f.cancelled() and f.exception() is None:
+                delete_uploaded_file(self.client, f.result())
+
+        if not future.cancel():
+            future.add_done_callback(_cleanup)
+
+    def _pop_stale(self, stale) -> list[Future]:
+        # lock 안에서 호출
+        futures = [self._futures.pop(k) for k in stale if k in self._futures]
+        for k in stale:
+            self._touched.pop(k, None)
+        return futures
+
+    def discard_except(self, keep_keys) -> int:
+        """keep_keys에 없는 미사용 업로드를 정리하고 정리한 개수 반환."""
+        keep = set(keep_keys)
+        with self._lock:
+            futures = self._pop_stale([k for k in self._futures if k not in keep])
+            self._taken &= keep
+        for f in futures:
+            self._discard(f)
+        return len(futures)
+
+    def sweep(self) -> int:
+        """ttl 동안 prefetch되지 않은 미사용 업로드 정리. 남은 업로드가 없으면 업로드 스레드도 종료."""
+        now = time.monotonic()
+        with self._lock:
+            futures = self._pop_stale([k for k, t in self._touched.items() if now - t >= self.ttl])
+            executor = None
+            if not self._futures:
+                executor, self._executor = self._executor, None
+        for f in futures:
+            self._discard(f)
+        if executor is not None:
+            executor.shutdown(wait=False)
+        return len(futures)
+
+    def _sweep_loop(self) -> None:
+        while True:
+            time.sleep(min(SPECULATIVE_SWEEP_INTERVAL, self.ttl))
+            self.sweep()
+            with self._lock:
+                if not self._futures:
+                    self._sweeper = None
+                    return
+
+    def close(self) -> None:
+        self.discard_except(())
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+@atexit.register
+def _close_live_uploaders() -> None:
+    for uploader in list(_live_uploaders):
+        uploader.close()
+
+
+PIPELINE_MODES = ("epic", "epts")
+
+
+def iter_pipeline_modes(
+    client: OpenAI,
+    pdf_items: list[tuple[str, bytes]],
+    modes: tuple[str, ...] = ("epic",),
+    prompt: str | None = None,
+    model: str = "gpt-4.1",
+    cascade: bool = False,
+    uploader: SpeculativeUploader | None = None,
+    upload_workers: int = PIPELINE_WORKERS,
+    generate_workers: int = PIPELINE_WORKERS,
+    latency_tracker: LatencyTracker | None = None,
+    order: list[int] | None = None,
+    upload_keys: list[str] | None = None,
+):
+    """
+    PDF 여러 개를 단계별 파이프라인으로 처리하며 (인덱스, {모드: 결과 dict})를 완료 순서대로 yield.
+    - 추출: PyMuPDF 미리보기 텍스트 (전용 스레드 1개, CPU) — 모드 수와 관계없이 문서당 한 번
+    - 업로드: uploader에 미리 올라간 파일이 있으면 재사용, 없으면 업로드 (upload_workers개) — 문서당 한 번
+    - 생성: 모드("epic", "epts")마다 Responses API 호출 (generate_workers개, 같은 문서의 모드끼리도 동시에)
+    - 삭제: 그 파일의 모든 모드 생성이 끝나면 정리 (전용 스레드 1개, 생성 워커를 막지 않음)
+    결과 dict는 process_one_pdf / process_one_pdf_epts (cascade=True면 process_one_pdf_cascade)와 같고,
+    성공한 결과에는 잘리지 않은 전체 텍스트 "추출 텍스트"를 더한다 (화면에는 표시하지 않고 검색 인덱스 저장용).
+    latency_tracker를 주면 생성 단계에서 p95 기반 timeout + 헤지 요청 사용.
+    order를 주면 그 순서로 투입 (예: schedule_longest_first로 긴 문서 먼저).
+    upload_keys(pdf_items와 같은 순서의 upload_key 결과)를 주면 uploader 조회 때 해시를 다시 계산하지 않음.
+    yield는 호출한 스레드에서 일어나므로 Streamlit 진행 표시를 그대로 갱신할 수 있다.
+    호출한 쪽이 중간에 멈추면(generator close, Streamlit rerun/stop) 남은 업로드·생성은 API를 부르지 않고 건너뛰며,
+    이미 올린 파일은 삭제 단계로 보낸다. 진행 중이던 호출은 백그라운드에서 끝나고 정리되므로 close는 기다리지 않는다.
+    """
+    modes = tuple(modes)
+    unknown = [m for m in modes if m not in PIPELINE_MODES]
+    if not modes or unknown:
+        raise ValueError(f"modes는 {PIPELINE_MODES} 중에서 골라야 합니다: {modes}")
+    upload_q: queue.Queue = queue.Queue()
+    generate_q: queue.Queue = queue.Queue()
+    delete_q: queue.Queue = queue.Queue()
+    out_q: queue.Queue = queue.Queue()
+    # file_id별 아직 끝나지 않은 생성 수 (0이 되면 삭제)
+    open_generations: dict[str, int] = {}
+    open_lock = threading.Lock()
+    stop = threading.Event()
+
+    order = list(order) if order is not None else list(range(len(pdf_items)))
+
+    def extract_stage():
+        for idx in order:
+            if stop.is_set():
+                break
+            pdf_bytes = pdf_items[idx][1]
+            try:
+                with profile_stage("추출"):
+                    text = extract_text_from_pdf(pdf_bytes)
+            except Exception:
+                text = ""
+            out_q.put(("text", idx, None, text))
+
+    def upload_stage():
+        while True:
+            idx = upload_q.get()
+            if idx is None:
+                break
+            if stop.is_set():
+                continue  # 미리 올린 업로드는 uploader에 그대로 둠 (다음 실행에서 재사용하거나 만료 시 정리)
+            name, pdf_bytes = pdf_items[idx]
+            try:
+                key = upload_keys[idx] if upload_keys is not None else None
+                future = uploader.take(name, pdf_bytes, key=key) if uploader is not None else None
+                file_id = None
+                if future is not None:
+                    try:
+                        file_id = future.result()
+                    except Exception:
+                        file_id = None  # 미리 올린 업로드가 실패하면 다시 업로드
+                if file_id is None:
+                    if stop.is_set():
+                        continue
+                    with profile_stage("업로드"):
+                        file_id = upload_pdf_file(client, pdf_bytes, name)
+                if stop.is_set():
+                    delete_q.put(file_id)
+                    continue
+                with open_lock:
+                    open_generations[file_id] = len(modes)
+                for mode in modes:
+                    generate_q.put((idx, file_id, mode))
+            except Exception as e:
+                for mode in modes:
+                    out_q.put(("gen", idx, mode, {"오류": str(e)}))
+
+    def generate_stage():
+        while True:
+            job = generate_q.get()
+            if job is None:
+                break
+            idx, file_id, mode = job
+            name, pdf_bytes = pdf_items[idx]
+            if mode == "epts":
+                system_text, user_text = epts_request_texts(os.path.splitext(os.path.basename(name))[0])
+                validate = validate_epts_abstract
+            else:
+                system_text, user_text = epic_request_texts(prompt)
+                validate = validate_epic_abstract
+            attempts = []
+            try:
+                if stop.is_set():
+                    continue  # 중단됨: 생성은 건너뛰고 finally에서 파일만 정리
+                with profile_stage("생성"):
+                    if cascade:
+                        summary, problems = generate_with_cascade(
+                            client, file_id, system_text, user_text, validate, attempts=attempts,
+                            latency_tracker=latency_tracker, size_bytes=len(pdf_bytes),
+                        )
+                        extra = {"사용 모델": cascade_used_model(attempts), "검증 오류": problems, "시도 내역": attempts}
+                    elif latency_tracker is not None:
+                        summary = request_abstract_hedged(
+                            client, file_id, system_text, user_text, model=model,
+                            size_bytes=len(pdf_bytes), tracker=latency_tracker,
+                        ).output_text
+                        extra = {}
+                    else:
+                        summary = request_abstract(client, file_id, system_text, user_text, model=model).output_text
+                        extra = {}
+                out_q.put(("gen", idx, mode, {"요약 결과": summary, "오류": None, **extra}))
+            except Exception as e:
+                extra = {"사용 모델": "", "검증 오류": [], "시도 내역": attempts} if cascade else {}
+                out_q.put(("gen", idx, mode, {"오류": str(e), **extra}))
+            finally:
+                with open_lock:
+                    open_generations[file_id] -= 1
+                    last = open_generations[file_id] == 0
+                    if last:
+                        del open_generations[file_id]
+                if last:
+                    delete_q.put(file_id)
+
+    def delete_stage():
+        while True:
+            file_id = delete_q.get()
+            if file_id is None:
+                break
+            delete_uploaded_file(client, file_id)
+
+    # 단계 스레드도 호출한 쪽(세션)의 메모리 프로파일러에 기록
+    uploaders = [threading.Thread(target=bind_profiler(upload_stage), daemon=True) for _ in range(upload_workers)]
+    generators = [threading.Thread(target=bind_profiler(generate_stage), daemon=True) for _ in range(generate_workers)]
+    deleter = threading.Thread(target=delete_stage, daemon=True)
+    extractor = threading.Thread(target=bind_profiler(extract_stage), daemon=True)
+    for t in [extractor, deleter, *uploaders, *generators]:
+        t.start()
+    for idx in order:
+        upload_q.put(idx)
+    for _ in uploaders:
+        upload_q.put(None)
+
+    texts: dict[int, str] = {}
+    generated: dict[int, dict[str, dict]] = {}
+    try:
+        remaining = len(pdf_items)
+        while remaining:
+            kind, idx, mode, payload = out_q.get()
+            if kind == "text":
+                texts[idx] = payload
+            else:
+                generated.setdefault(idx, {})[mode] = payload
+            if idx not in texts or len(generated.get(idx, ())) < len(modes):
+                continue
+            remaining -= 1
+            name = pdf_items[idx][0]
+            text = texts.pop(idx)
+            text_preview = (text[:3000] + "...") if len(text) > 3000 else text
+            rows = {}
+            for mode, gen in generated.pop(idx).items():
+                if gen["오류"] is None:
+                    row = {
+                        "파일명": name,
+                        "텍스트파싱 결과": text_preview,
+                        "요약 결과": gen.pop("요약 결과"),
+                        "관리자 경로": admin_url_from_filename(name, is_epts=mode == "epts"),
+                        "오류": None,
+                        "추출 텍스트": text,
+                    }
+                else:
+                    row = {
+                        "파일명": name,
+                        "텍스트파싱 결과": "",
+                        "요약 결과": "",
+                        "관리자 경로": "",
+                        "오류": gen["오류"],
+                    }
+                gen.pop("오류")
+                row.update(gen)
+                rows[mode] = row
+            yield idx, rows
+    except GeneratorExit:
+        stop.set()
+        raise
+    finally:
+        def shutdown():
+            # 업로드가 끝난 뒤 생성·삭제 단계 종료 신호
+            for t in uploaders:
+                t.join()
+            for _ in generators:
+                generate_q.put(None)
+            for t in generators:
+                t.join()
+            delete_q.put(None)
+
+        if stop.is_set():
+            # 중단된 경우 진행 중인 호출을 기다리지 않고 정리는 백그라운드에서
+            threading.Thread(target=shutdown, daemon=True).start()
+        else:
+            shutdown()
+
+
+def iter_pipeline(
+    client: OpenAI,
+    pdf_items: list[tuple[str, bytes]],
+    is_epts: bool = False,
+    **kwargs,
+):
+    """
+    한 가지 모드만 처리하는 iter_pipeline_modes. (인덱스, 결과 dict)를 완료 순서대로 yield.
+    나머지 인자(prompt, model, cascade, uploader, latency_tracker, order 등)는 iter_pipeline_modes와 같다.
+    """
+    mode = "epts" if is_epts else "epic"
+    with closing(iter_pipeline_modes(client, pdf_items, modes=(mode,), **kwargs)) as pipeline:
+        for idx, rows in pipeline:
+            yield idx, rows[mode]
+
+
+def run_pipeline(client: OpenAI, pdf_items: list[tuple[str, bytes]], **kwargs) -> list[dict]:
+    """iter_pipeline 결과를 입력 순서대로 모아 반환."""
+    results: list[dict | None] = [None] * len(pdf_items)
+    for idx, row in iter_pipeline(client, pdf_items, **kwargs):
+        results[idx] = row
+    return results
+
 
+# -------------------------------------------------
+# 짧은 보도자료 묶음 처리: 여러 문서를 구분자로 묶어 한 번에 요청 후 문서별로 분리
+# -------------------------------------------------
+# 추출 텍스트가 이 길이 이하인 문서만 묶음 대상 (2~3쪽 보도자료)
+PACK_MAX_DOC_CHARS = 6000
+# 한 요청에 묶는 추출 텍스트 총량과 문서 수
+PACK_BUDGET_CHARS = 24000
+PACK_MAX_DOCS = 5
+_PACKED_HEADER_RE = re.compile(r"^<<<초록 (\d+)>>>\s*$", re.MULTILINE)
 
 
+def plan_packs(
+    text_lengths: list[int],
+    max_doc_chars: int = PACK_MAX_DOC_CHARS,
+    budget_chars: int = PACK_BUDGET_CHARS,
+    max_docs: int = PACK_MAX_DOCS,
+) -> tuple[list[list[int]], list[int]]:
+    """
+    추출 텍스트 길이로 묶음 구성 (긴 문서부터 first-fit).
+    (묶음 목록[인덱스 목록], 단독 처리할 인덱스 목록) 반환. 문서가 하나뿐인 묶음은 단독 처리로 돌림.
+    """
+    singles = [i for i, n in enumerate(text_lengths) if n == 0 or n > max_doc_chars]
+    packs: list[list[int]] = []
+    sizes: list[int] = []
+    candidates = sorted((i for i, n in enumerate(text_lengths) if 0 < n <= max_doc_chars), key=lambda i: -text_lengths[i])
+    for i in candidates:
+        for p, pack in enumerate(packs):
+            if len(pack) < max_docs and sizes[p] + text_lengths[i] <= budget_chars:
+                pack.append(i)
+                sizes[p] += text_lengths[i]
+                break
+        else:
+            packs.append([i])
+            sizes.append(text_lengths[i])
+    singles += [pack[0] for pack in packs if len(pack) == 1]
+    return [sorted(pack) for pack in packs if len(pack) > 1], sorted(singles)
+
+
+def packed_user_text(docs: list[tuple[str, str]], prompt: str | None = None) -> str:
+    """묶음 요청 본문: 지침 + 문서별 구분자로 감싼 추출 텍스트."""
+    n = len(docs)
+    parts = [
+        prompt or DEFAULT_PROMPT,
+        f"\n이번에는 서로 다른 보도자료 {n}건이 아래에 <<<문서 k>>> ~ <<<문서 k 끝>>>으로 구분되어 있다.\n"
+        f"각 보도자료마다 위 지침을 모두 따른 초록을 따로 작성하고, 문서 순서대로 {n}개를 출력한다.\n"
+        "각 초록은 반드시 '<<<초록 k>>>' 한 줄(k는 문서 번호)로 시작하며, 그 외 설명은 출력하지 않는다.\n"
+        "서로 다른 문서의 내용을 섞지 않는다.\n",
+    ]
+    for k, (name, text) in enumerate(docs, start=1):
+        parts.append(f"<<<문서 {k}>>>\n[파일명] {name}\n{text.strip()}\n<<<문서 {k} 끝>>>")
+    return "\n\n".join(parts)
+
+
+def split_packed_output(output: str, n: int) -> list[str] | None:
+    """묶음 응답을 문서별 초록으로 분리. 구분자가 1..n 순서대로 정확히 있지 않으면 None."""
+    matches = list(_PACKED_HEADER_RE.finditer(output or ""))
+    if [int(m.group(1)) for m in matches] != list(range(1, n + 1)):
+        return None
+    abstracts = []
+    for m, nxt in zip(matches, matches[1:] + [None]):
+        abstracts.append(output[m.end():nxt.start() if nxt else len(output)].strip())
+    return abstracts
+
+
+def iter_packed(
+    client: OpenAI,
+    pdf_items: list[tuple[str, bytes]],
+    prompt: str | None = None,
+    model: str = "gpt-4.1",
+    max_workers: int = 4,
+    latency_tracker: LatencyTracker | None = None,
+):
+    """
+    EPIC 보도자료 묶음 처리. (인덱스, 결과 dict)를 완료 순서대로 yield (호출한 스레드에서).
+    - 짧은 문서는 추출 텍스트를 묶어 한 번의 chat 요청으로 처리 (업로드·삭제 왕복과 지침 반복 전송 절약)
+    - 응답 분리에 실패하거나 validate_epic_abstract를 통과하지 못한 문서는 process_one_pdf로 단독 재처리
+    결과 dict는 process_one_pdf와 같은 키에 "묶음 문서 수"(단독 처리면 1)를 추가.
+    묶음 요청에는 normalize_pdf_text로 정리한 텍스트를 보내고, 묶음 결과에는 "절감 글자수"도 추가.
+    "추출 텍스트"에는 잘리지 않은 전체 텍스트를 담는다 (화면에는 표시하지 않고 검색 인덱스 저장용).
+    """
+    texts, saved_chars = [], []
+    for _, pdf_bytes in pdf_items:
+        try:
+            text, norm_stats = extract_normalized_text(pdf_bytes)
+        except Exception:
+            text, norm_stats = "", {"절감 글자수": 0}
+        texts.append(text)
+        saved_chars.append(norm_stats["절감 글자수"])
+    packs, singles = plan_packs([len(t) for t in texts])
+
+    def run_single(idx: int) -> list[tuple[int, dict]]:
+        name, pdf_bytes = pdf_items[idx]
+        row = process_one_pdf(client, name, pdf_bytes, prompt=prompt, model=model, latency_tracker=latency_tracker)
+        return [(idx, {**row, "묶음 문서 수": 1, "추출 텍스트": texts[idx]})]
+
+    def run_pack(pack: list[int]) -> list[tuple[int, dict]]:
+        docs = [(pdf_items[i][0], texts[i]) for i in pack]
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": EPIC_SYSTEM_TEXT},
+                    {"role": "user", "content": packed_user_text(docs, prompt)},
+                ],
+                temperature=0.3,
+                timeout=DEFAULT_TIMEOUT,
+            )
+            abstracts = split_packed_output(response.choices[0].message.content, len(pack))
+        except Exception:
+            abstracts = None
+        if abstracts is None:
+            abstracts = [""] * len(pack)
+
+        out = []
+        for i, summary in zip(pack, abstracts):
+            if not summary or validate_epic_abstract(summary):
+                out.extend(run_single(i))  # 분리·검증 실패 → 단독 요청
+                continue
+            name = pdf_items[i][0]
+            text = texts[i]
+            out.append((i, {
+                "파일명": name,
+                "텍스트파싱 결과": (text[:3000] + "...") if len(text) > 3000 else text,
+                "요약 결과": summary,
+                "관리자 경로": admin_url_from_filename(name, is_epts=False),
+                "오류": None,
+                "묶음 문서 수": len(pack),
+                "절감 글자수": saved_chars[i],
+                "추출 텍스트": text,
+            }))
+        return out
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pack")
+    # 작업 스레드도 호출한 쪽(세션)의 메모리 프로파일러에 기록
+    run_pack, run_single = bind_profiler(run_pack), bind_profiler(run_single)
+    futures = [executor.submit(run_pack, pack) for pack in packs]
+    futures += [executor.submit(run_single, idx) for idx in singles]
+    try:
+        for future in as_completed(futures):
+            yield from future.result()
+    finally:
+        # 중간에 멈추면 아직 시작하지 않은 요청은 취소하고 진행 중인 요청은 기다리지 않음
+        executor.shutdown(wait=False, cancel_futures=True)
+
 
+# -------------------------------------------------
+# 사전 추정(pre-flight) + 긴 문서 우선 배치 스케줄링
+# -------------------------------------------------
+# 앞쪽 몇 쪽만 텍스트를 읽어 문서 전체 분량을 추정 (전체 추출은 하지 않음)
+PREFLIGHT_SAMPLE_PAGES = 2
+# 추정 계수 (한국어 보도자료 기준 대략값, 관측치로 조정)
+TOKENS_PER_CHAR = 0.8
+PDF_PAGE_IMAGE_TOKENS = 800  # 파일 입력은 쪽 이미지도 함께 들어감
+OUTPUT_TOKENS = {"epic": 600, "epts": 2500}
+BASE_SECONDS = 6.0
+SECONDS_PER_PAGE = 0.8
+OUTPUT_TOKENS_PER_SECOND = 50.0
 
 
+def estimate_pdf_cost(pdf_bytes: bytes, is_epts: bool = False) -> dict:
+    """
+    PDF 한 건의 예상 토큰·소요시간을 싸게 추정 (쪽수, 바이트 크기, 앞쪽 미리보기 글자 수).
+    비용은 모델에 따라 다르므로 estimate_cost(model, 예상 입력 토큰, 예상 출력 토큰)로 따로 계산.
+    """
+    page_count, sample_chars, sample_pages = 0, 0, 0
+    try:
+        import fitz  # PyMuPDF
 
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        try:
+            page_count = doc.page_count
+            sample_pages = min(PREFLIGHT_SAMPLE_PAGES, page_count)
+            sample_chars = sum(len(doc[i].get_text("text")) for i in range(sample_pages))
+        finally:
+            doc.close()
+    except Exception:
+        # 열 수 없으면 크기로만 추정 (약 100KB/쪽)
+        page_count = max(1, len(pdf_bytes) // 100_000)
+
+    chars_per_page = (sample_chars / sample_pages) if sample_pages else 1500
+    system_text = SYSTEM_RULES_EPTS if is_epts else DEFAULT_PROMPT
+    input_tokens = int(
+        len(system_text) * TOKENS_PER_CHAR
+        + chars_per_page * page_count * TOKENS_PER_CHAR
+        + page_count * PDF_PAGE_IMAGE_TOKENS
+    )
+    output_tokens = OUTPUT_TOKENS["epts" if is_epts else "epic"]
+    seconds = BASE_SECONDS + page_count * SECONDS_PER_PAGE + output_tokens / OUTPUT_TOKENS_PER_SECOND
+    return {
+        "쪽수": page_count,
+        "바이트": len(pdf_bytes),
+        "미리보기 글자수": sample_chars,
+        "예상 입력 토큰": input_tokens,
+        "예상 출력 토큰": output_tokens,
+        "예상 소요시간(초)": seconds,
+    }
+
+
+def schedule_longest_first(estimates: list[dict]) -> list[int]:
+    """예상 소요시간이 긴 문서부터 처리하는 순서 (LPT: 마지막에 긴 문서가 남아 배치가 늘어지는 것을 방지)."""
+    return sorted(range(len(estimates)), key=lambda i: -estimates[i]["예상 소요시간(초)"])
+
+
+def estimate_makespan(seconds: list[float], workers: int = PIPELINE_WORKERS) -> float:
+    """주어진 순서대로 비어 있는 워커에 배정했을 때 전체 완료 시간(초)."""
+    loads = [0.0] * max(1, workers)
+    for s in seconds:
+        i = loads.index(min(loads))
+        loads[i] += s
+    return max(loads) if seconds else 0.0
+
+
+def preflight_batch(estimates: list[dict], model: str = "gpt-4.1", workers: int = PIPELINE_WORKERS) -> dict:
+    """배치 실행 전 요약: 긴 문서 우선 순서, 예상 완료 시간(ETA), 예상 토큰·비용."""
+    order = schedule_longest_first(estimates)
+    seconds = [estimates[i]["예상 소요시간(초)"] for i in order]
+    input_tokens = sum(e["예상 입력 토큰"] for e in estimates)
+    output_tokens = sum(e["예상 출력 토큰"] for e in estimates)
+    return {
+        "순서": order,
+        "예상 완료 시간(초)": estimate_makespan(seconds, workers),
+        "업로드 순서 완료 시간(초)": estimate_makespan([e["예상 소요시간(초)"] for e in estimates], workers),
+        "예상 입력 토큰": input_tokens,
+        "예상 출력 토큰": output_tokens,
+        "예상 비용(USD)": estimate_cost(model, input_tokens, output_tokens),
+    }